@@ -0,0 +1,105 @@
+"""
+recall@k and latency of the IVF index, or of a quantized first pass (--quantization), against brute-force exact search.
+
+    python -m benchmarks.ann_recall                       # synthetic clustered corpus
+    python -m benchmarks.ann_recall --real-store          # embeddings from the saved VectorStore
+    python -m benchmarks.ann_recall --quantization int8   # top-k overlap with and without the full-precision re-rank
+"""
+import argparse
+import time
+from typing import List, Set
+import numpy as np
+from settings.ann_index import IVFIndex, top_k_indices
+from settings.quantization import QuantizedMatrix
+
+def synthetic_corpus(n: int, dim: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    """ Normalized points scattered around random topic centers, roughly how newsletter embeddings group by genre """
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    points = centers[rng.integers(0, clusters, n)] + 1.5 * rng.standard_normal((n, dim)).astype(np.float32)
+    return points / np.linalg.norm(points, axis=1, keepdims=True)
+
+def make_queries(matrix: np.ndarray, num_queries: int, rng: np.random.Generator) -> np.ndarray:
+    rows = np.asarray(matrix[rng.choice(matrix.shape[0], num_queries, replace=False)], dtype=np.float32)
+    queries = rows + 1.0 * rng.standard_normal(rows.shape).astype(np.float32) / np.sqrt(rows.shape[1])
+    # float32 like the served query embeddings (np.sqrt above would otherwise promote the queries, and every scan, to float64)
+    return (queries / np.linalg.norm(queries, axis=1, keepdims=True)).astype(np.float32)
+
+def overlap(found: List[Set[int]], exact: List[Set[int]]) -> float:
+    return float(np.mean([len(f & e) / len(e) for f, e in zip(found, exact) if e]))
+
+def benchmark_ivf(matrix: np.ndarray, queries: np.ndarray, exact: List[Set[int]], exact_ms: float, args: argparse.Namespace) -> None:
+    start = time.perf_counter()
+    index = IVFIndex.build(matrix, n_lists=args.n_lists)
+    print(f"built {index.n_lists} lists in {time.perf_counter() - start:.2f}s")
+
+    for nprobe in (int(p) for p in args.nprobe.split(",")):
+        start = time.perf_counter()
+        found = [set(index.search(matrix, q, args.k, nprobe)[0].tolist()) for q in queries]
+        ann_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        print(f"{'nprobe=' + str(nprobe):>10} recall@{args.k}={overlap(found, exact):.3f}  {ann_ms:8.3f} ms/query  ({exact_ms / ann_ms:.1f}x)")
+
+def benchmark_quantization(matrix: np.ndarray, queries: np.ndarray, exact: List[Set[int]], exact_ms: float,
+                           args: argparse.Namespace) -> None:
+    """ Same two passes as VectorStore.retrieve_top_k: top-k straight from the codes, then codes -> k * factor -> float32 re-score """
+    start = time.perf_counter()
+    quantized = QuantizedMatrix.from_float(matrix, args.quantization)
+    print(f"quantized to {quantized.mode} in {time.perf_counter() - start:.2f}s "
+          f"({quantized.codes.nbytes / 2**20:.1f} MiB vs {matrix.nbytes / 2**20:.1f} MiB float32)")
+
+    start = time.perf_counter()
+    found = [set(top_k_indices(quantized.scores(q), args.k).tolist()) for q in queries]
+    raw_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    print(f"{'no rerank':>10} top{args.k} overlap={overlap(found, exact):.3f}  {raw_ms:8.3f} ms/query  ({exact_ms / raw_ms:.1f}x)")
+
+    for factor in (int(f) for f in args.rerank_factor.split(",")):
+        start = time.perf_counter()
+        found = []
+        for q in queries:
+            candidates = np.sort(top_k_indices(quantized.scores(q), args.k * factor))
+            candidate_scores = np.asarray(matrix[candidates], dtype=np.float32) @ q
+            found.append(set(candidates[top_k_indices(candidate_scores, args.k)].tolist()))
+        rerank_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        print(f"{'rerank x' + str(factor):>10} top{args.k} overlap={overlap(found, exact):.3f}  {rerank_ms:8.3f} ms/query  ({exact_ms / rerank_ms:.1f}x)")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--real-store", action="store_true", help="benchmark the saved VectorStore instead of synthetic data")
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--n-lists", type=int, default=None)
+    parser.add_argument("--nprobe", type=str, default="1,2,4,8,16,32")
+    parser.add_argument("--quantization", choices=["int8", "float16"], default=None,
+                        help="measure a quantized first pass instead of the IVF index")
+    parser.add_argument("--rerank-factor", type=str, default=None,
+                        help="comma-separated re-rank depths (default: config.quantization_rerank_factor)")
+    args = parser.parse_args()
+    if args.rerank_factor is None:
+        from settings import Config
+        args.rerank_factor = str(Config.get_instance().quantization_rerank_factor)
+
+    rng = np.random.default_rng(0)
+    if args.real_store:
+        from settings import VectorStore
+        vector_store = VectorStore.get_instance()
+        vector_store.load()
+        matrix = vector_store.embedding_matrix
+    else:
+        matrix = synthetic_corpus(args.n, args.dim, args.clusters, rng)
+    queries = make_queries(matrix, min(args.queries, matrix.shape[0]), rng)
+    print(f"corpus: {matrix.shape[0]} x {matrix.shape[1]}, {queries.shape[0]} queries, k={args.k}")
+
+    start = time.perf_counter()
+    exact = [set(top_k_indices(matrix @ q, args.k).tolist()) for q in queries]
+    exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    print(f"{'exact':>10} recall@{args.k}=1.000  {exact_ms:8.3f} ms/query")
+
+    if args.quantization:
+        benchmark_quantization(matrix, queries, exact, exact_ms, args)
+    else:
+        benchmark_ivf(matrix, queries, exact, exact_ms, args)
+
+if __name__ == "__main__":
+    main()
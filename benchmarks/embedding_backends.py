@@ -0,0 +1,56 @@
+"""
+Parity and CPU latency/throughput of the embedding backends (torch vs ONNX Runtime) on the same texts.
+
+    python -m benchmarks.embedding_backends                       # torch vs onnx (int8 if onnx_quantize_int8)
+    python -m benchmarks.embedding_backends --texts 512 --batch-size 32
+"""
+import argparse
+import time
+import numpy as np
+import torch
+from utils.embedding_backends import get_backend
+from utils.embedding_handler import embed_sorted_batches
+
+SAMPLE = ("Researchers released a new open-weight language model that matches larger systems on reasoning benchmarks "
+          "while running on a single GPU. The accompanying paper describes the data mixture and training schedule. ")
+
+def sample_texts(n: int, rng: np.random.Generator):
+    """ Texts of varied length (a few words up to ~500 tokens), like the mix of titles/queries and article bodies """
+    return [SAMPLE * int(rng.integers(1, 14)) for _ in range(n)]
+
+def time_backend(backend, texts, batch_size: int):
+    embed_sorted_batches(texts[:2], backend, batch_size)  # warm-up / lazy export
+    start = time.perf_counter()
+    for text in texts[:32]:
+        embed_sorted_batches([text], backend, 1)
+    single_ms = (time.perf_counter() - start) * 1000 / min(32, len(texts))
+
+    start = time.perf_counter()
+    embeddings = np.stack(embed_sorted_batches(texts, backend, batch_size))
+    batched_secs = time.perf_counter() - start
+    return embeddings, single_ms, len(texts) / batched_secs
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--backends", type=str, default="torch,onnx")
+    args = parser.parse_args()
+
+    texts = sample_texts(args.texts, np.random.default_rng(0))
+    cpu = torch.device("cpu")
+    print(f"{len(texts)} texts, batch size {args.batch_size}, {torch.get_num_threads()} threads")
+
+    reference = None
+    for name in args.backends.split(","):
+        embeddings, single_ms, throughput = time_backend(get_backend(cpu, name), texts, args.batch_size)
+        line = f"{name:>6}  {single_ms:8.2f} ms/text (batch=1)  {throughput:8.1f} texts/s (batched)"
+        if reference is None:
+            reference = embeddings
+        else:
+            cosines = np.sum(embeddings * reference, axis=1)
+            line += f"  max|diff|={np.abs(embeddings - reference).max():.4f}  min cos={cosines.min():.4f}"
+        print(line)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Local stand-in for the Ollama chat API (POST /api/chat, streamed or not) so LLM-facing stages can run without a model.
+Replies echo the start of the last user message, cut to the request's num_predict, after a fixed per-request delay
+(plus an optional per-token delay on streamed replies), or fail with a 500 when it contains the server's fail_marker;
+the server counts requests and the peak number handled at once, which is how the ingest summary stage's bound is checked.
+
+    python -m benchmarks.fake_ollama --port 11435 --latency-ms 800     # then set "summary_endpoint": "http://127.0.0.1:11435"
+"""
+import argparse
+import asyncio
+import json
+import socket
+import time
+from typing import Any, Dict, Optional
+from aiohttp import web
+
+CHARS_PER_TOKEN = 4
+
+def last_user_message(request: Dict[str, Any]) -> str:
+    messages = [message for message in request.get("messages", []) if message.get("role") == "user"]
+    return messages[-1]["content"] if messages else ""
+
+def fake_reply(request: Dict[str, Any]) -> str:
+    text = " ".join(last_user_message(request).split()) or "ok"
+    num_predict = (request.get("options") or {}).get("num_predict") or 128
+    return text[:max(1, num_predict) * CHARS_PER_TOKEN]
+
+class FakeOllamaServer:
+    """
+    Serves /api/chat on 127.0.0.1 ([port] 0 picks a free one), waiting [latency_ms] per request and [token_latency_ms] per
+    streamed word. Requests mentioning [fail_marker] fail with HTTP 500 after the same delay.
+    """
+    def __init__(self, port: int = 0, latency_ms: float = 0.0, token_latency_ms: float = 0.0, fail_marker: Optional[str] = None):
+        self.port = port
+        self.latency_ms = latency_ms
+        self.token_latency_ms = token_latency_ms
+        self.fail_marker = fail_marker
+        self.requests_failed = 0
+        self.requests_served = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def _body(self, request: Dict[str, Any], content: str, done: bool, eval_count: int = 0) -> Dict[str, Any]:
+        body = {
+            "model": request.get("model", "fake"),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "message": {"role": "assistant", "content": content},
+            "done": done
+        }
+        if done:
+            body.update({"done_reason": "stop", "total_duration": int(self.latency_ms * 1e6), "eval_count": eval_count,
+                         "eval_duration": max(1, int(self.latency_ms * 1e6))})
+        return body
+
+    async def _chat(self, http_request: web.Request) -> web.StreamResponse:
+        request = await http_request.json()
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency_ms:
+                await asyncio.sleep(self.latency_ms / 1000)
+            if self.fail_marker and self.fail_marker in last_user_message(request):
+                self.requests_failed += 1
+                return web.json_response({"error": "fake failure"}, status=500)
+            reply = fake_reply(request)
+            eval_count = len(reply) // CHARS_PER_TOKEN + 1
+            self.requests_served += 1
+            if not request.get("stream", True):
+                return web.json_response(self._body(request, reply, True, eval_count))
+
+            response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+            await response.prepare(http_request)
+            for word in reply.split(" "):
+                if self.token_latency_ms:
+                    await asyncio.sleep(self.token_latency_ms / 1000)
+                await response.write((json.dumps(self._body(request, word + " ", False)) + "\n").encode("utf-8"))
+            await response.write((json.dumps(self._body(request, "", True, eval_count)) + "\n").encode("utf-8"))
+            await response.write_eof()
+            return response
+        finally:
+            self.in_flight -= 1
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_post("/api/chat", self._chat)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind(("127.0.0.1", self.port))
+        self.port = sock.getsockname()[1]
+        await web.SockSite(self._runner, sock).start()
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> 'FakeOllamaServer':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
+
+async def serve(port: int, latency_ms: float, token_latency_ms: float) -> None:
+    async with FakeOllamaServer(port, latency_ms, token_latency_ms) as server:
+        print(f"fake Ollama listening on {server.url} (latency {latency_ms}ms)")
+        await asyncio.Event().wait()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay before every reply")
+    parser.add_argument("--token-latency-ms", type=float, default=0.0, help="delay before every streamed word")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.port, args.latency_ms, args.token_latency_ms))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Cold import time of the app's modules (each in a fresh interpreter) and the separate cost of loading the embedding model.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --modules settings utils.data_io --repeat 5
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+DEFAULT_MODULES = [
+    "settings",
+    "utils.data_io",
+    "utils.ollama_client",
+    "utils.embedding_handler",
+    "document_fetch.newsletter_data_fetch",
+    "cli",
+]
+
+IMPORT_SNIPPET = "import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+WARM_SNIPPET = (
+    "import time; from settings import ModelResources; start = time.perf_counter(); "
+    "ModelResources.get_instance().warm(); print(time.perf_counter() - start)"
+)
+
+def time_snippet(snippet: str, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", snippet], capture_output=True, text=True, check=True).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(timings)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-model", action="store_true", help="don't time the embedding model load")
+    args = parser.parse_args()
+
+    for module in args.modules:
+        try:
+            seconds = time_snippet(IMPORT_SNIPPET.format(module=module), args.repeat)
+            print(f"{'import ' + module:<45} {seconds * 1000:10.1f} ms")
+        except subprocess.CalledProcessError as e:
+            print(f"{'import ' + module:<45} failed: {e.stderr.strip().splitlines()[-1] if e.stderr else e}")
+
+    if not args.skip_model:
+        seconds = time_snippet(WARM_SNIPPET, args.repeat)
+        print(f"{'ModelResources.warm()':<45} {seconds * 1000:10.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Offline, reproducible parse_feeds benchmark on recorded feed/article fixtures, reporting per-stage throughput.
+
+    python -m benchmarks.ingest record --fixtures /app/data_store/fixtures/2026-10-17     # one live run, saves responses
+    python -m benchmarks.ingest replay --fixtures /app/data_store/fixtures/2026-10-17     # replays them from localhost
+    python -m benchmarks.ingest replay --fixtures ... --engine cpu --latency-ms 50 --repeat 3 --compare-embedding
+    python -m benchmarks.ingest replay --fixtures ... --summaries --llm-latency-ms 800     # summary stage on a fake Ollama
+"""
+import argparse
+import asyncio
+import contextlib
+import tempfile
+import time
+from typing import Dict, List, Optional
+from settings import Config
+from document_fetch.http_replay import RecordingSession, ReplayServer, ReplaySession
+from document_fetch import newsletter_data_fetch as ingest
+from benchmarks.fake_ollama import FakeOllamaServer
+
+config = Config.get_instance()
+
+def point_store_at(directory: str) -> None:
+    """ Keeps benchmark runs from overwriting the real store """
+    config.vector_store_dir = f"{directory}/vector_db"
+    config.vector_store = f"{directory}/vector_db.pkl"
+    config.feed_validators_store = f"{directory}/feed_validators.json"
+
+async def record(fixture_dir: str) -> None:
+    recorders: List[RecordingSession] = []
+
+    def wrap(session):
+        recorders.append(RecordingSession(session, fixture_dir))
+        return recorders[-1]
+
+    await ingest.parse_feeds(incremental=False, session_wrapper=wrap)
+    recorders[-1].save()
+    print(f"recorded {len(recorders[-1].manifest)} responses to {fixture_dir}")
+
+async def replay_once(fixture_dir: str, latency_ms: float, engine: str, llm_latency_ms: Optional[float]) -> Dict[str, float]:
+    """ [llm_latency_ms] runs the summary stage against a FakeOllamaServer with that delay (None skips the stage) """
+    async with contextlib.AsyncExitStack() as stack:
+        server = await stack.enter_async_context(ReplayServer(fixture_dir, latency_ms=latency_ms))
+        llm = None
+        if llm_latency_ms is not None:
+            llm = await stack.enter_async_context(FakeOllamaServer(latency_ms=llm_latency_ms))
+            config.summary_endpoint = llm.url
+        vector_store = await ingest.parse_feeds(incremental=False, session_wrapper=lambda session: ReplaySession(session, server),
+                                                embedding_engine=None if engine == "auto" else engine,
+                                                summarize=llm is not None)
+    timings = dict(ingest.stage_timings)
+    timings["near_duplicates"] = ingest.articles_skipped["near_duplicates"]
+    timings["replay_misses"] = server.misses
+    timings["llm_max_in_flight"] = llm.max_in_flight if llm else 0
+
+    save_start = time.perf_counter()
+    vector_store.save()
+    timings["save_seconds"] = time.perf_counter() - save_start
+    timings["chunks_saved"] = len(vector_store.chunks)
+    return timings
+
+def rate(items: float, seconds: float) -> str:
+    return f"{items / seconds:10.1f}/s" if seconds > 0 else f"{'-':>12}"
+
+def report(timings: Dict[str, float]) -> None:
+    rows = [
+        ("feed fetch", timings["feed_fetch_seconds"], timings["feeds_fetched"], "feeds"),
+        ("article fetch", timings["fetch_seconds"], timings["articles_fetched"], "articles"),
+        ("readability (cpu)", timings["extraction_seconds"], timings["articles_extracted"], "articles"),
+        ("fetch+extract wall", timings["fetch_extract_wall_seconds"], timings["articles_extracted"], "articles"),
+        ("near-dup dedup", timings["dedup_seconds"], timings["articles_deduplicated"], "articles"),
+        ("chunk+embed", timings["embedding_seconds"], timings["passages_embedded"], "passages"),
+        ("summaries", timings["summary_seconds"], timings["articles_summarized"], "articles"),
+        ("search indexes", timings["index_seconds"], timings["passages_embedded"], "passages"),
+        ("VectorStore.save", timings["save_seconds"], timings["chunks_saved"], "chunks"),
+    ]
+    for stage, seconds, items, unit in rows:
+        print(f"{stage:>20} {seconds:8.2f}s {int(items):7d} {unit:<9} {rate(items, seconds)}")
+    print(f"{'':>20} {int(timings['near_duplicates'])} near-duplicates dropped, {int(timings['replay_misses'])} unrecorded requests")
+    if timings["llm_max_in_flight"]:
+        print(f"{'':>20} at most {int(timings['llm_max_in_flight'])} summary requests in flight (limit {config.summary_concurrency})")
+
+def compare_embedding(texts: List[str]) -> None:
+    """ CPU (length-bucketed, optionally sharded) vs GPU batched path on the exact passages from the replayed run """
+    from utils.embedding_handler import has_gpu, prepare_embeddings_cpu, prepare_embeddings_gpu
+    engines = [("cpu", prepare_embeddings_cpu)] + ([("gpu", prepare_embeddings_gpu)] if has_gpu() else [])
+    for name, embed in engines:
+        embed(texts[:8])  # warm-up (model load / backend export)
+        start = time.perf_counter()
+        embed(texts)
+        seconds = time.perf_counter() - start
+        print(f"{name + ' embedding':>20} {seconds:8.2f}s {len(texts):7d} passages  {rate(len(texts), seconds)}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("--fixtures", required=True, help="fixture directory to write (record) or serve (replay)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay added to every replayed response")
+    parser.add_argument("--engine", choices=["auto", "cpu", "gpu"], default="auto")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--compare-embedding", action="store_true", help="also time every embedding path on the replayed passages")
+    parser.add_argument("--summaries", action="store_true", help="run the ingest summary stage against a local fake Ollama")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="fake Ollama delay per summary request")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        point_store_at(scratch)
+        if args.mode == "record":
+            asyncio.run(record(args.fixtures))
+            return
+        for run in range(args.repeat):
+            print(f"run {run + 1}/{args.repeat} (engine={args.engine}, latency={args.latency_ms}ms)")
+            llm_latency_ms = args.llm_latency_ms if args.summaries else None
+            report(asyncio.run(replay_once(args.fixtures, args.latency_ms, args.engine, llm_latency_ms)))
+        if args.compare_embedding:
+            compare_embedding([chunk.text for chunk in ingest.vector_store.chunks])
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,25 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse, PlainTextResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Any, Tuple, AsyncGenerator, Literal
+from datetime import datetime, timezone
+import asyncio
 import json
+import time
 
-from utils.ollama_client import generate_response_stream
-from settings import Config, Logger, VectorStore
-from utils.embedding_handler import prepare_embeddings
+from utils.ollama_client import generate_response_stream, close_client, warm_model
+from settings import Config, Logger, VectorStore, SearchHit, SearchFilter, ModelResources
+from utils.embedding_handler import prepare_embeddings_batch
+from utils.embedding_batcher import EmbeddingBatcher
+from utils.query_cache import QueryCache
+from utils.store_reloader import StoreReloader
+from utils.retrieval_handles import RetrievalHandles
 from utils.data_io import format_chunks
+from utils.metrics import (registry, query_embedding_seconds, vector_search_seconds, format_chunks_seconds,
+                           llm_stream_duration_seconds)
 
 app = FastAPI(title="Evan's Chatbot")
 config = Config.get_instance()
@@ -17,13 +27,67 @@ runtime_logger = Logger.get_runtime_logger("chatbot")
 vector_store = VectorStore.get_instance()
 vector_store.load()
 runtime_logger.info("Loaded data into vector store")
+query_batcher = EmbeddingBatcher(prepare_embeddings_batch,
+                                 max_batch_size=config.query_batch_size,
+                                 max_wait_ms=config.query_batch_wait_ms)
+query_cache = QueryCache(max_entries=config.query_cache_size, ttl_seconds=config.query_cache_ttl_seconds)
+store_reloader = StoreReloader(vector_store, interval_seconds=config.store_reload_interval_seconds)
+retrieval_handles = RetrievalHandles(ttl_seconds=config.retrieval_handle_ttl_seconds)
+
+registry.gauge("chatbot_vector_store_chunks", "Passages in the active VectorStore generation", lambda: len(vector_store.chunks))
+registry.gauge("chatbot_vector_store_documents", "Newsletters in the active VectorStore generation", lambda: len(vector_store.data))
+registry.gauge("chatbot_vector_store_embedding_bytes", "Size of the active embedding matrix", lambda: vector_store.embedding_matrix.nbytes)
+registry.gauge("chatbot_vector_store_generation", "In-process generation counter of the active store", lambda: vector_store.generation)
+registry.gauge("chatbot_query_cache_entries", "Entries in the query result cache", lambda: query_cache.stats()["size"])
+registry.counter("chatbot_query_cache_hits_total", "Query cache hits", lambda: query_cache.hits)
+registry.counter("chatbot_query_cache_misses_total", "Query cache misses", lambda: query_cache.misses)
+registry.counter("chatbot_query_cache_evictions_total", "Query cache LRU evictions", lambda: query_cache.evictions)
+
+class SearchFilters(BaseModel):
+    newsletters: Optional[List[str]] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    source_type: Optional[Literal["arxiv", "blog"]] = None
+
+    def to_search_filter(self) -> SearchFilter:
+        return SearchFilter(
+            newsletters=tuple(sorted(set(self.newsletters))) if self.newsletters else None,
+            since=unix_time(self.since),
+            until=unix_time(self.until),
+            source_type=self.source_type
+        )
+
+def unix_time(value: Optional[datetime]) -> Optional[float]:
+    if value is None:
+        return None
+    # dates without an offset are taken as UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
 
 class Message(BaseModel):
     message: str
+    filters: Optional[SearchFilters] = None
 
 class ChatRequest(BaseModel):
     message: str
-    articles_list: Optional[List[Dict]] = None
+    retrieval_id: Optional[str] = None
+    # the /related_articles filters, so a retrieval id this process doesn't know can be re-run with the same scope
+    filters: Optional[SearchFilters] = None
+
+@app.on_event("startup")
+async def startup():
+    store_reloader.start()
+    if config.warm_model_on_startup:
+        # load in the background so the app serves immediately; a query arriving first just waits on the load
+        asyncio.get_running_loop().run_in_executor(None, ModelResources.get_instance().warm)
+    # load + pin the LLM now rather than on the first chat (first-token latency otherwise includes the model load)
+    app.state.llm_warmup = asyncio.create_task(warm_model())
+
+@app.on_event("shutdown")
+async def shutdown():
+    store_reloader.stop()
+    await close_client()
 
 templates = Jinja2Templates(directory="templates")
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -33,44 +97,105 @@ def chatbot(request: Request):
     runtime_logger.info("Routing user to chat.html")
     return templates.TemplateResponse("chat.html", {"request": request})
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/store_status", response_class=JSONResponse)
+def store_status():
+    return vector_store.status()
+
+def find_related_articles(message: str, filters: Optional[SearchFilters] = None) -> List[SearchHit]:
+    search_filter = filters.to_search_filter() if filters is not None else None
+    scope = repr(search_filter) if search_filter is not None and not search_filter.is_empty() else ""
+    generation = vector_store.generation
+    cached = query_cache.get(message, generation, scope)
+    if cached is not None:
+        query_embedding, related_articles = cached
+    else:
+        with query_embedding_seconds.time():
+            query_embedding = query_batcher.embed(message)
+        with vector_search_seconds.time():
+            related_articles = vector_store.retrieve_top_k(query_embedding=query_embedding, search_filter=search_filter,
+                                                           query_text=message)
+        query_cache.put(message, generation, (query_embedding, related_articles), scope)
+    runtime_logger.info(f"Found {len(related_articles)} articles of relative similarity to user's query: {message} (cache: {query_cache.stats()})")
+    return related_articles
+
+def format_related(related_articles: List[SearchHit]) -> Tuple[List[Dict[str, Any]], Any]:
+    if len(related_articles) == 0:
+        return [], ["No newsletter data was found related to your query."]
+    with format_chunks_seconds.time():
+        return format_chunks(related_articles)
+
 @app.post("/related_articles", response_class=JSONResponse)
 def related_articles_endpoint(query: Message):
-    message = query.message
-    query_embedding = prepare_embeddings(message)
-    related_articles = vector_store.retrieve_top_k(query_embedding=query_embedding)
-    runtime_logger.info(f"Found {len(related_articles)} articles of relative similarity to user's query: {query}")
-    if len(related_articles) == 0:
-        articles_list = []
-        json_formatted = ["No newsletter data was found related to your query."]
-    else:
-        articles_list, json_formatted = format_chunks(related_articles)
+    related_articles = find_related_articles(query.message, query.filters)
+    _, json_formatted = format_related(related_articles)
 
     return {
-        "articles_list": articles_list,  # to feed into LLM
+        "retrieval_id": retrieval_handles.create(related_articles),  # resolved server-side by /chat
         "related_text": json_formatted    # to display in sidebar
     }
 
-@app.post("/chat")
-async def chat_endpoint(body: ChatRequest):
-    message = body.message
-    articles_list = body.articles_list or []
-    runtime_logger.info(f"Beginning stream of: {message}")
-
+def stream_llm_response(message: str, articles_list: List[Dict[str, Any]]) -> AsyncGenerator[str, None]:
     async def event_stream():
         chunk_count = 0
         total_sent = ""
+        start = time.perf_counter()
         try:
             async for chunk in generate_response_stream(message, articles_list):
                 chunk_count += 1
                 total_sent += chunk
                 yield chunk
             runtime_logger.info(f"Total chunks sent: {chunk_count}, Total characters: {len(total_sent)}")
+        except asyncio.CancelledError:
+            runtime_logger.info(f"Client disconnected after {chunk_count} chunks")
+            raise
         except Exception as e:
             runtime_logger.error(f"Streaming error: {str(e)}")
             yield f"data: {json.dumps({'error': str(e)})}\n\n"
+        finally:
+            llm_stream_duration_seconds.observe(time.perf_counter() - start)
 
-    return StreamingResponse(event_stream(), media_type="text/plain",
+    return event_stream()
+
+def streaming_response(stream: AsyncGenerator[str, None]) -> StreamingResponse:
+    return StreamingResponse(stream, media_type="text/plain",
                              headers={
                                  "Cache-Control": "no-cache",
                                  "Connection": "keep-alive",
                                  })
+
+@app.post("/chat")
+async def chat_endpoint(body: ChatRequest):
+    message = body.message
+    articles_list = []
+    if body.retrieval_id:
+        hits = retrieval_handles.get(body.retrieval_id)
+        if hits is None:
+            # expired, or created by another uvicorn worker (handles are per process): retrieve again for this message
+            runtime_logger.warning(f"Unknown or expired retrieval id {body.retrieval_id}, re-running retrieval")
+            articles_list, _ = await run_in_threadpool(lambda: format_related(find_related_articles(message, body.filters)))
+        else:
+            # reads (memory-mapped) passage texts, so keep it off the event loop like /ask
+            articles_list, _ = await run_in_threadpool(format_related, hits)
+    runtime_logger.info(f"Beginning stream of: {message}")
+    return streaming_response(stream_llm_response(message, articles_list))
+
+@app.post("/ask")
+async def ask_endpoint(query: Message):
+    """
+    Single call for the chat UI: first line is the sidebar JSON ({"related_text": ...}), everything after it is LLM tokens
+    """
+    message = query.message
+    # embedding + search (and reading hit texts) block, so keep them off the event loop
+    articles_list, json_formatted = await run_in_threadpool(lambda: format_related(find_related_articles(message, query.filters)))
+    runtime_logger.info(f"Beginning stream of: {message}")
+
+    async def combined_stream():
+        yield json.dumps({"related_text": json_formatted}) + "\n"
+        async for chunk in stream_llm_response(message, articles_list):
+            yield chunk
+
+    return streaming_response(combined_stream())
@@ -2,7 +2,7 @@ import os
 import asyncio
 import time
 from settings import Config, Logger
-from document_fetch.newsletter_data_fetch import parse_feeds
+from document_fetch.newsletter_data_fetch import parse_feeds, save_feed_validators
 
 READY_FILE = '/app/data_store/vector_store_ready'
 config = Config.get_instance()
@@ -17,7 +17,11 @@ def run() -> None:
         vector_store = asyncio.run(parse_feeds())
         
         os.makedirs('/app/data_store', exist_ok=True)
-        vector_store.save()
+        if vector_store.save():
+            save_feed_validators()
+        else:
+            # keep the previous validators so the next run re-downloads every feed this store is missing
+            logger.warning("VectorStore was not saved, leaving feed validators unchanged")
         
         # Creates readiness flag which signals to 'web' service/container to startup
         with open(READY_FILE, 'w') as f:
@@ -0,0 +1,60 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import ollama
+from settings import Config, Logger
+from utils.ollama_client import close_ollama_client
+
+config = Config.get_instance()
+daily_logger = Logger.get_daily_logger("data_fetch")
+
+SUMMARY_SYSTEM_PROMPT = (
+    "You summarize tech newsletter articles for a research assistant. "
+    "Reply with 3-6 short bullet points (-) covering what happened, who is involved, key numbers, model/paper names and why "
+    "it matters. No preamble, no headings, no opinions."
+)
+
+async def summarize_articles(articles: List[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Generates one compact summary per article through the Ollama chat API at config.summary_endpoint (defaults to the
+    chat LLM's endpoint; point it at benchmarks/fake_ollama.py to run the stage offline), at most
+    config.summary_concurrency requests at a time. The model and num_ctx default to the chat model's, so Ollama serves the
+    summaries from the runner /chat already keeps loaded instead of swapping a second model in.
+    Failed articles are just left without a summary and /chat falls back to their text.
+
+    Returns:
+        {article_id: summary}
+    """
+    if not articles:
+        return {}
+    client = ollama.AsyncClient(host=config.summary_endpoint or config.llm["Endpoint"], timeout=config.llm.get("Timeout", 120))
+    semaphore = asyncio.Semaphore(config.summary_concurrency)
+    start = time.perf_counter()
+
+    async def summarize(article: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+        async with semaphore:
+            try:
+                response = await client.chat(
+                    model=config.summary_model or config.llm["Model"],
+                    messages=[
+                        {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+                        {"role": "user", "content": f"Title: {article['title']}\n\n{article['content'][:config.summary_input_chars]}"}
+                    ],
+                    options={"temperature": 0.2, "num_ctx": config.llm["Num_Ctx"], "num_predict": config.summary_max_tokens},
+                    keep_alive=config.llm.get("Keep_Alive")
+                )
+                summary = response["message"]["content"].strip()
+                return article["article_id"], summary or None
+            except Exception as e:
+                daily_logger.warning(f"Failed to summarize {article['url']}: {str(e)}")
+                return article["article_id"], None
+
+    try:
+        results = await asyncio.gather(*(summarize(article) for article in articles))
+    finally:
+        await close_ollama_client(client)
+
+    summaries = {article_id: summary for article_id, summary in results if summary}
+    daily_logger.info(f"Summarized {len(summaries)}/{len(articles)} articles in {time.perf_counter() - start:.2f}s "
+                      f"({config.summary_concurrency} concurrent requests)")
+    return summaries
@@ -0,0 +1,158 @@
+"""
+Record/replay of the ingest's HTTP traffic so parse_feeds can be benchmarked on fixed inputs.
+
+RecordingSession wraps the shared aiohttp session during a live run and saves every feed/article response to a fixture
+directory. ReplayServer later serves those responses from localhost and ReplaySession points the same requests at it, so a
+replayed run still goes through aiohttp, sockets and HTTP parsing but never touches the network.
+
+Fixture layout: manifest.json ({url: {"key", "status", "headers"}}) plus bodies/<key> holding the decoded response body.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import socket
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+import aiohttp
+from aiohttp import web
+
+MANIFEST_FILE = "manifest.json"
+BODIES_DIR = "bodies"
+# only headers the ingest reads; Content-Encoding/Length are dropped because bodies are stored decompressed
+RECORDED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+def fixture_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+
+def host_of(url: str) -> str:
+    return urlsplit(url).netloc
+
+class _RecordedResponse:
+    """ Proxies an aiohttp response and stores its body once the ingest has read it """
+    def __init__(self, response: aiohttp.ClientResponse, recorder: 'RecordingSession', url: str):
+        self._response = response
+        self._recorder = recorder
+        self._url = url
+        self.status = response.status
+        self.headers = response.headers
+
+    async def read(self) -> bytes:
+        body = await self._response.read()
+        self._recorder.record(self._url, self._response, body)
+        return body
+
+    async def text(self, *args: Any, **kwargs: Any) -> str:
+        text = await self._response.text(*args, **kwargs)
+        # aiohttp keeps the body after text(), so this does not read the stream twice
+        self._recorder.record(self._url, self._response, await self._response.read())
+        return text
+
+class _RecordingRequest:
+    def __init__(self, request_context: Any, recorder: 'RecordingSession', url: str):
+        self._request_context = request_context
+        self._recorder = recorder
+        self._url = url
+
+    async def __aenter__(self) -> _RecordedResponse:
+        response = await self._request_context.__aenter__()
+        if response.status != 200:
+            # non-200s are replayed too (with no body) so a replay fails the same articles the live run did
+            self._recorder.record(self._url, response, b"")
+        return _RecordedResponse(response, self._recorder, self._url)
+
+    async def __aexit__(self, *exc_info: Any) -> Any:
+        return await self._request_context.__aexit__(*exc_info)
+
+class RecordingSession:
+    """ Stand-in for the aiohttp session that performs real requests and records the responses into [fixture_dir] """
+    def __init__(self, session: aiohttp.ClientSession, fixture_dir: str):
+        self._session = session
+        self.fixture_dir = fixture_dir
+        self.manifest: Dict[str, Dict[str, Any]] = {}
+        os.makedirs(os.path.join(fixture_dir, BODIES_DIR), exist_ok=True)
+
+    def get(self, url: str, **kwargs: Any) -> _RecordingRequest:
+        return _RecordingRequest(self._session.get(url, **kwargs), self, url)
+
+    def record(self, url: str, response: aiohttp.ClientResponse, body: bytes) -> None:
+        key = fixture_key(url)
+        with open(os.path.join(self.fixture_dir, BODIES_DIR, key), 'wb') as f:
+            f.write(body)
+        self.manifest[url] = {
+            "key": key,
+            "status": response.status,
+            "headers": {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers}
+        }
+
+    def save(self) -> None:
+        path = os.path.join(self.fixture_dir, MANIFEST_FILE)
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(f"{path}.tmp", path)
+
+class ReplayServer:
+    """
+    Serves recorded responses from localhost. Each original host gets its own port, so the ingest's per-host connection
+    limit (TCPConnector(limit_per_host=10)) applies the same way it does against the live sites.
+    [latency_ms] adds a fixed delay per response to approximate a real network round trip.
+    """
+    def __init__(self, fixture_dir: str, latency_ms: float = 0.0):
+        self.fixture_dir = fixture_dir
+        self.latency_ms = latency_ms
+        with open(os.path.join(fixture_dir, MANIFEST_FILE), 'r') as f:
+            self.manifest: Dict[str, Dict[str, Any]] = json.load(f)
+        self.by_key = {entry["key"]: entry for entry in self.manifest.values()}
+        self.ports: Dict[str, int] = {}
+        self.requests_served = 0
+        self.misses = 0
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        entry = self.by_key.get(request.match_info["key"])
+        if entry is None:
+            self.misses += 1
+            return web.Response(status=404, text="not recorded")
+        self.requests_served += 1
+        with open(os.path.join(self.fixture_dir, BODIES_DIR, entry["key"]), 'rb') as f:
+            body = f.read()
+        return web.Response(status=entry["status"], body=body, headers=entry["headers"])
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/{key}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        for host in sorted({host_of(url) for url in self.manifest}):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.bind(("127.0.0.1", 0))
+            self.ports[host] = sock.getsockname()[1]
+            await web.SockSite(self._runner, sock).start()
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> 'ReplayServer':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
+
+    def local_url(self, url: str) -> str:
+        # unrecorded hosts all go to the first port, which answers 404 like an unreachable page
+        port = self.ports.get(host_of(url)) or next(iter(self.ports.values()))
+        return f"http://127.0.0.1:{port}/{fixture_key(url)}"
+
+class ReplaySession:
+    """ Stand-in for the aiohttp session that sends every request to the ReplayServer instead of the live site """
+    def __init__(self, session: aiohttp.ClientSession, server: ReplayServer):
+        self._session = session
+        self._server = server
+
+    def get(self, url: str, **kwargs: Any) -> Any:
+        return self._session.get(self._server.local_url(url), **kwargs)
@@ -0,0 +1,82 @@
+"""
+MinHash LSH near-duplicate detection for syndicated stories that reach us from several feeds with slightly different titles.
+"""
+import hashlib
+import re
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+_WORD = re.compile(r"\w+")
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+
+def _stable_hash(value: str, digest_size: int = 4) -> int:
+    """ Process-independent hash (unlike hash()) so signatures stored by one ingest run match the next """
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=digest_size).digest(), "little")
+
+def shingles(text: str, shingle_words: int = 4) -> set:
+    words = _WORD.findall(text.lower())
+    if len(words) < shingle_words:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + shingle_words]) for i in range(len(words) - shingle_words + 1)}
+
+class MinHasher:
+    """
+    b-bit MinHash: [num_perm] universal hash permutations over the shingle set, keeping the low 8 bits of each minimum.
+    The fraction of equal positions in two signatures estimates the Jaccard similarity of their shingle sets
+    (slightly inflated by 1/256 chance collisions, corrected in similarity()).
+    """
+    def __init__(self, num_perm: int = 128, shingle_words: int = 4):
+        self.num_perm = num_perm
+        self.shingle_words = shingle_words
+        # derived from fixed strings rather than an RNG so the permutations never change between versions or runs
+        self.a = np.asarray([_stable_hash(f"minhash-a-{i}") % (int(_MERSENNE_PRIME) - 1) + 1 for i in range(num_perm)], dtype=np.uint64)
+        self.b = np.asarray([_stable_hash(f"minhash-b-{i}") % int(_MERSENNE_PRIME) for i in range(num_perm)], dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = np.fromiter((_stable_hash(shingle) for shingle in shingles(text, self.shingle_words)), dtype=np.uint64)
+        hashes %= _MERSENNE_PRIME
+        # (a*x + b) mod p stays below 2^62, so uint64 never overflows
+        permuted = (hashes[:, None] * self.a + self.b) % _MERSENNE_PRIME
+        return (permuted.min(axis=0) & np.uint64(0xFF)).astype(np.uint8)
+
+    @staticmethod
+    def similarity(a: np.ndarray, b: np.ndarray) -> float:
+        matches = float(np.mean(a == b))
+        return max(0.0, (matches - 1 / 256) / (1 - 1 / 256))
+
+class NearDuplicateIndex:
+    """
+    LSH over MinHash signatures: a signature is cut into [bands] bands and two articles become candidates when any band is
+    identical, so only candidates are compared instead of every stored article. With 32 bands of 4 rows a pair with
+    Jaccard 0.5 is found ~87% of the time and 0.6 ~99%; candidates are then confirmed against [threshold].
+    """
+    def __init__(self, hasher: MinHasher, threshold: float = 0.5, bands: int = 32):
+        self.hasher = hasher
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = hasher.num_perm // bands
+        self.tables: List[Dict[bytes, List[Tuple[np.ndarray, str]]]] = [{} for _ in range(bands)]
+        self.size = 0
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def find(self, signature: np.ndarray) -> Optional[str]:
+        """ Key of a stored near-duplicate of [signature], or None """
+        for table, band_key in zip(self.tables, self._band_keys(signature)):
+            for other, key in table.get(band_key, ()):
+                if MinHasher.similarity(signature, other) >= self.threshold:
+                    return key
+        return None
+
+    def add(self, signature: np.ndarray, key: str) -> None:
+        for table, band_key in zip(self.tables, self._band_keys(signature)):
+            table.setdefault(band_key, []).append((signature, key))
+        self.size += 1
+
+def encode_signature(signature: np.ndarray) -> str:
+    return signature.tobytes().hex()
+
+def decode_signature(encoded: str) -> np.ndarray:
+    return np.frombuffer(bytes.fromhex(encoded), dtype=np.uint8)
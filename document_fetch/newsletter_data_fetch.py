@@ -1,34 +1,102 @@
 import feedparser
 import asyncio
+import calendar
 import aiohttp
+import hashlib
+import json
+import os
 import uuid
 import torch
 import time
-from bs4 import BeautifulSoup
-from readability import Document
-from typing import List, Dict, Any, Optional, Set
+import numpy as np
+from typing import List, Dict, Any, Optional, Set, Callable, Tuple
 from settings import Config, Logger, Chunk, VectorStore
 from utils.data_io import read_json
-from utils.embedding_handler import prepare_embeddings, prepare_embeddings_gpu
+from utils.embedding_handler import prepare_embeddings_cpu, prepare_embeddings_gpu
+from utils.passage_chunking import split_passages
+from document_fetch.html_extraction import ExtractionStage
+from document_fetch.near_duplicates import MinHasher, NearDuplicateIndex, encode_signature, decode_signature
+from document_fetch.article_summaries import summarize_articles
 
 
 config = Config.get_instance()
 daily_logger = Logger.get_daily_logger("data_fetch")
 vector_store = VectorStore.get_instance()
-articles_skipped = {"too_long": 0, "duplicates": 0}
+articles_skipped = {"duplicates": 0, "near_duplicates": 0, "already_indexed": 0, "outside_retention": 0}
+passage_stats = {"articles": 0, "passages": 0, "capped": 0}
+# per-feed HTTP validators ({url: {"etag": ..., "last_modified": ...}}) persisted between daily runs
+feed_validators: Dict[str, Dict[str, str]] = {}
+feeds_not_modified: Set[str] = set()
+# per-stage counters for the current parse_feeds run (logged, and read by benchmarks/ingest.py)
+stage_timings: Dict[str, float] = {}
 
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 has_gpu = torch.cuda.is_available()
 daily_logger.info(f"Using device: {device}")
 
-async def parse_feeds() -> VectorStore:
+def reset_stage_timings() -> None:
+    stage_timings.clear()
+    stage_timings.update({
+        "feed_fetch_seconds": 0.0, "feeds_fetched": 0,
+        "fetch_seconds": 0.0, "articles_fetched": 0,
+        "extraction_seconds": 0.0, "articles_extracted": 0, "fetch_extract_wall_seconds": 0.0,
+        "dedup_seconds": 0.0, "articles_deduplicated": 0,
+        "embedding_seconds": 0.0, "passages_embedded": 0,
+        "summary_seconds": 0.0, "articles_summarized": 0,
+        "index_seconds": 0.0
+    })
+
+reset_stage_timings()
+
+async def parse_feeds(
+        incremental: Optional[bool] = None,
+        session_wrapper: Optional[Callable[[aiohttp.ClientSession], Any]] = None,
+        embedding_engine: Optional[str] = None,
+        summarize: Optional[bool] = None
+    ) -> VectorStore:
     """
     Reads in relevant content from the newsletters/RSS feeds and stores into data structure for further preprocessing
 
+    Args:
+        incremental: extend yesterday's store with only new articles instead of rebuilding it (defaults to config.incremental_ingest)
+        session_wrapper: wraps the shared aiohttp session (record/replay fixtures in document_fetch/http_replay.py)
+        embedding_engine: "gpu" or "cpu" to force an embedding path (default: GPU when available)
+        summarize: generate per-article summaries for /chat after embedding (defaults to config.summarize_at_ingest)
+
     Returns:
         Dictionary storing relavant article content indexed by newsletter
     """
-    vector_store.reset()
+    if incremental is None:
+        incremental = config.incremental_ingest
+
+    known_urls: Set[str] = set()
+    known_hashes: Set[str] = set()
+    # title dedup stays within one run; across runs only url/content hash count, since recurring titles are new posts
+    titles_seen = set()
+    retention_cutoff = None
+    if incremental:
+        vector_store.load()
+        retention_cutoff = time.time() - config.retention_days * 86400
+        # collected before expiring so articles that just aged out aren't re-downloaded while the feed still lists them
+        for chunk in vector_store.chunks:
+            known_urls.add(chunk.url)
+            if getattr(chunk, "content_hash", None):
+                known_hashes.add(chunk.content_hash)
+        expired = vector_store.expire(retention_cutoff)
+        daily_logger.info(f"Incremental ingest: {len(known_urls)} articles ({len(vector_store.chunks)} passages) already indexed, {expired} passages expired (retention {config.retention_days} days)")
+        if known_urls:
+            load_feed_validators()
+        else:
+            # no store was loaded (missing or lost): a 304 would leave it empty, so fetch every feed in full
+            daily_logger.warning("No stored articles found, ignoring saved feed validators")
+            feed_validators.clear()
+    else:
+        # a full rebuild needs every feed body, so never send conditional headers
+        vector_store.clear()
+        feed_validators.clear()
+    feeds_not_modified.clear()
+    reset_stage_timings()
+    articles_skipped.update(dict.fromkeys(articles_skipped, 0))
     rss_sources = read_json(config.rss_feeds_store)["urls"]
 
     # template header to avoid request blocks
@@ -41,12 +109,13 @@ async def parse_feeds() -> VectorStore:
             "Accept-Language": "en-US,en;q=0.9",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"
         }
-    titles_seen = set()
     
     extracting_start = time.perf_counter()
     conn = aiohttp.TCPConnector(limit_per_host=10)
-    async with aiohttp.ClientSession(headers=headers, connector=conn) as session:
-        tasks = [extract_newsletter_content(session, newsletter_name, newsletter_url, titles_seen) for newsletter_name, newsletter_url in rss_sources.items()]
+    extraction_stage = ExtractionStage(workers=config.extraction_workers, queue_size=config.extraction_queue_size)
+    async with aiohttp.ClientSession(headers=headers, connector=conn) as client_session, extraction_stage:
+        session = session_wrapper(client_session) if session_wrapper is not None else client_session
+        tasks = [extract_newsletter_content(session, extraction_stage, newsletter_name, newsletter_url, titles_seen, known_urls, known_hashes, retention_cutoff) for newsletter_name, newsletter_url in rss_sources.items()]
         
         articles_by_newsletter = await asyncio.gather(*tasks, return_exceptions=True)
 
@@ -58,6 +127,8 @@ async def parse_feeds() -> VectorStore:
 
         if isinstance(articles, Exception):
             daily_logger.error(f"Error extracting {newsletter_name}: {articles}")
+        elif newsletter_name in feeds_not_modified:
+            daily_logger.info(f"Feed unchanged since last run (304) for {newsletter_name}")
         elif articles:
             all_articles[newsletter_name] = articles
             articles_processed += len(articles)
@@ -65,42 +136,78 @@ async def parse_feeds() -> VectorStore:
             daily_logger.warning(f"No articles extracted for {newsletter_name}")
 
     extract_end = time.perf_counter() - extracting_start
+    stage_timings.update({
+        "extraction_seconds": extraction_stage.extract_seconds,
+        "articles_extracted": extraction_stage.processed,
+        "fetch_extract_wall_seconds": extract_end
+    })
     daily_logger.info(f"Extraction of newsletter content complete: {articles_processed} articles extracted in {extract_end:.2f}s")
+    daily_logger.info(
+        f"Stage timings: fetch {stage_timings['fetch_seconds']:.2f}s over {stage_timings['articles_fetched']} articles, "
+        f"HTML extraction {extraction_stage.extract_seconds:.2f}s CPU over {extraction_stage.processed} articles "
+        f"on {extraction_stage.workers} processes, {extraction_stage.queue_wait_seconds:.2f}s queued"
+    )
+
+    dedup_start = time.perf_counter()
+    await asyncio.to_thread(drop_near_duplicates, all_articles)
+    stage_timings["dedup_seconds"] = time.perf_counter() - dedup_start
+    stage_timings["articles_deduplicated"] = articles_processed
+    daily_logger.info(f"Near-duplicate check dropped {articles_skipped['near_duplicates']} syndicated copies in {stage_timings['dedup_seconds']:.2f}s")
 
     chunking_start = time.perf_counter()
-    if has_gpu:
+    use_gpu = has_gpu if embedding_engine is None else embedding_engine == "gpu"
+    if use_gpu:
         daily_logger.info("Using GPU-accelerated processing")
-        chunks_processed = await chunk_articles_gpu(all_articles)
+        chunks_processed = await chunk_articles_batched(all_articles, prepare_embeddings_gpu, "GPU")
     else:
-        daily_logger.info("Processing embeddings sequentially [Cuda not found]")
-        chunks_processed = await chunk_articles_sequential(all_articles)
+        daily_logger.info(f"Processing embeddings in CPU batches{'' if has_gpu else ' [Cuda not found]'}")
+        chunks_processed = await chunk_articles_batched(all_articles, prepare_embeddings_cpu, "CPU")
     
     chunk_end = time.perf_counter() - chunking_start
-    daily_logger.info(f"Chunking/Embedding complete: {chunks_processed} chunks created in {chunk_end:.2f}s")
-    daily_logger.info(f"Total processing time: {extract_end + chunk_end:.2f}s. Skipped {articles_skipped['too_long']} articles (too long) and {articles_skipped['duplicates']} duplicates")
+    stage_timings["embedding_seconds"] = chunk_end
+    stage_timings["passages_embedded"] = chunks_processed
+    daily_logger.info(f"Chunking/Embedding complete: {chunks_processed} passages from {passage_stats['articles']} articles created in {chunk_end:.2f}s ({passage_stats['capped']} articles cut at {config.max_passages_per_article} passages)")
+
+    if config.summarize_at_ingest if summarize is None else summarize:
+        summary_start = time.perf_counter()
+        summarized = await attach_summaries(all_articles)
+        stage_timings["summary_seconds"] = time.perf_counter() - summary_start
+        stage_timings["articles_summarized"] = summarized
+        daily_logger.info(f"Summary step took {stage_timings['summary_seconds']:.2f}s for {summarized} articles")
+
+    index_start = time.perf_counter()
+    await asyncio.to_thread(vector_store.build_search_indexes)
+    stage_timings["index_seconds"] = time.perf_counter() - index_start
+    daily_logger.info(f"Search index step took {stage_timings['index_seconds']:.2f}s")
+    daily_logger.info(f"Total processing time: {extract_end + chunk_end:.2f}s. Skipped {articles_skipped['duplicates']} duplicates, {articles_skipped['near_duplicates']} near-duplicates, {articles_skipped['already_indexed']} already indexed, {articles_skipped['outside_retention']} older than the retention window")
 
     return vector_store
 
 async def extract_newsletter_content(
         session: aiohttp.ClientSession,
+        extraction_stage: ExtractionStage,
         newsletter_name: str,
         newsletter_url: str,
-        titles_seen: Set[str]
+        titles_seen: Set[str],
+        known_urls: Set[str],
+        known_hashes: Set[str],
+        retention_cutoff: Optional[float] = None
     ) -> List[Dict[str, Any]]:
 
     try:
+        body = await fetch_feed(session, newsletter_name, newsletter_url)
+        if body is None:
+            return []
+
         loop = asyncio.get_running_loop()
-        feed = await asyncio.wait_for(
-            loop.run_in_executor(None, feedparser.parse, newsletter_url),
-            timeout=30
-        )
+        feed = await loop.run_in_executor(None, feedparser.parse, body)
 
         if not validate_parse(feed, newsletter_url):
             return []
         
         semaphore = set_semaphore(len(feed.entries), newsletter_url)
 
-        tasks = [extract_article_content(semaphore, entry, session, newsletter_name, titles_seen) for entry in feed.entries if hasattr(entry, "link")]
+        tasks = [extract_article_content(semaphore, entry, session, extraction_stage, newsletter_name, titles_seen, known_urls, known_hashes, retention_cutoff) for entry in feed.entries if hasattr(entry, "link")]
      
         results = await asyncio.gather(*tasks, return_exceptions=True)
 
@@ -121,6 +228,62 @@ async def extract_newsletter_content(
         daily_logger.error(f"Failed to parse RSS feed {newsletter_name}: {str(e)}")
         return []
 
+async def fetch_feed(session: aiohttp.ClientSession, newsletter_name: str, newsletter_url: str) -> Optional[bytes]:
+    """
+    Downloads the raw RSS feed through the shared session, sending If-None-Match/If-Modified-Since from the previous run
+
+    Returns:
+        Feed bytes for feedparser, or None if the feed is unchanged (304) or could not be fetched
+    """
+    fetch_start = time.perf_counter()
+    try:
+        return await _fetch_feed(session, newsletter_name, newsletter_url)
+    finally:
+        stage_timings["feed_fetch_seconds"] += time.perf_counter() - fetch_start
+        stage_timings["feeds_fetched"] += 1
+
+async def _fetch_feed(session: aiohttp.ClientSession, newsletter_name: str, newsletter_url: str) -> Optional[bytes]:
+    validators = feed_validators.get(newsletter_url, {})
+    request_headers = {"Accept": "application/rss+xml, application/atom+xml, application/xml;q=0.9, */*;q=0.8"}
+    if validators.get("etag"):
+        request_headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        request_headers["If-Modified-Since"] = validators["last_modified"]
+
+    async with session.get(newsletter_url, headers=request_headers, timeout=aiohttp.ClientTimeout(total=30)) as resp:
+        if resp.status == 304:
+            feeds_not_modified.add(newsletter_name)
+            return None
+        if resp.status != 200:
+            daily_logger.error(f"RSS feed returned status {resp.status} for {newsletter_url}")
+            return None
+        body = await resp.read()
+
+        new_validators = {}
+        if resp.headers.get("ETag"):
+            new_validators["etag"] = resp.headers["ETag"]
+        if resp.headers.get("Last-Modified"):
+            new_validators["last_modified"] = resp.headers["Last-Modified"]
+        feed_validators[newsletter_url] = new_validators
+    return body
+
+def load_feed_validators() -> None:
+    feed_validators.clear()
+    if os.path.exists(config.feed_validators_store):
+        try:
+            feed_validators.update(read_json(config.feed_validators_store))
+        except json.JSONDecodeError:
+            daily_logger.warning(f"Ignoring unreadable feed validators at {config.feed_validators_store}")
+
+def save_feed_validators() -> None:
+    """ Run only after the VectorStore is saved, otherwise a later 304 could skip articles that were never stored """
+    try:
+        with open(config.feed_validators_store, 'w') as f:
+            json.dump(feed_validators, f, indent=2)
+        daily_logger.info(f"Wrote validators for {len(feed_validators)} feeds to {config.feed_validators_store}")
+    except OSError as e:
+        daily_logger.error(f"Error saving feed validators to {config.feed_validators_store}: {e}")
+
 def validate_parse(feed: feedparser.FeedParserDict, url: str) -> bool:
     if hasattr(feed, "status") and feed.status != 200:
         daily_logger.error(f"RSS feed returned status {feed.status} for {url}")
@@ -143,14 +306,29 @@ async def extract_article_content(
         semaphore: asyncio.Semaphore,
         entry: Any,
         session: aiohttp.ClientSession,
+        extraction_stage: ExtractionStage,
         newsletter_name: str,
-        titles_seen: Set[str]
+        titles_seen: Set[str],
+        known_urls: Set[str],
+        known_hashes: Set[str],
+        retention_cutoff: Optional[float] = None
     ) -> Optional[Dict[str, Any]]:
     async with semaphore:
         try:
             article_url = entry.link
             title = getattr(entry, 'title', 'No Title')
 
+            # incremental ingest: don't re-download articles that are already in the store
+            if article_url in known_urls:
+                articles_skipped["already_indexed"] += 1
+                return None
+
+            # entries already older than the retention window would only be expired again on the next run
+            published_at = entry_published_at(entry)
+            if retention_cutoff is not None and published_at is not None and published_at < retention_cutoff:
+                articles_skipped["outside_retention"] += 1
+                return None
+
             clean_title = ' '.join(title.lower().split())
             if clean_title in titles_seen:
                 articles_skipped["duplicates"] += 1
@@ -160,22 +338,26 @@ async def extract_article_content(
             if 'arxiv.org' in article_url:
                 content = extract_arxiv_paper(entry)
             else:
-                content = await extract_content_norm(session, article_url)
+                content = await extract_content_norm(session, extraction_stage, article_url)
 
             if not content:
                 titles_seen.discard(clean_title)
                 return None
-            
-            if len(content) > config.max_content_length:
-                articles_skipped["too_long"] += 1
-                titles_seen.discard(clean_title)
+
+            content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+            if content_hash in known_hashes:
+                articles_skipped["already_indexed"] += 1
                 return None
+            known_hashes.add(content_hash)
             
             return {
                 'title': title,
                 'url': article_url,
                 'content': content,
-                'newsletter': newsletter_name
+                'newsletter': newsletter_name,
+                'content_hash': content_hash,
+                'published_at': published_at,
+                'source_type': "arxiv" if 'arxiv.org' in article_url else "blog"
             }
             
         except Exception as e:
@@ -184,8 +366,17 @@ async def extract_article_content(
                 titles_seen.discard(clean_title)
             return None
 
-async def extract_content_norm(session: aiohttp.ClientSession, article_url: str
+def entry_published_at(entry: Any) -> Optional[float]:
+    """ Publish (or last update) time of a feed entry as unix time; feedparser normalizes both to UTC struct_time """
+    for field in ("published_parsed", "updated_parsed"):
+        parsed = getattr(entry, field, None)
+        if parsed:
+            return float(calendar.timegm(parsed))
+    return None
+
+async def extract_content_norm(session: aiohttp.ClientSession, extraction_stage: ExtractionStage, article_url: str
                                ) -> Optional[str]:
+    fetch_start = time.perf_counter()
     try:
         async with session.get(article_url, timeout=45) as resp:
             if resp.status != 200:
@@ -195,13 +386,13 @@ async def extract_content_norm(session: aiohttp.ClientSession, article_url: str
     except asyncio.TimeoutError:
         daily_logger.warning(f"Timeout fetching article: {article_url}")
         return None
+    finally:
+        stage_timings["fetch_seconds"] += time.perf_counter() - fetch_start
+    stage_timings["articles_fetched"] += 1
 
     try:
-        # extract main readable content
-        doc = Document(html)
-        summary_html = doc.summary()
-        soup = BeautifulSoup(summary_html, "html.parser")
-        content_text = " ".join([p.get_text() for p in soup.find_all("p")]).strip()
+        # readability/BeautifulSoup run in the process pool so the event loop keeps downloading
+        content_text = await extraction_stage.extract(html)
 
         if len(content_text) < 50:
             daily_logger.info(f"Article too short: {article_url}")
@@ -240,70 +431,109 @@ def extract_arxiv_paper(entry: Any) -> Optional[str]:
     
     return abstract
 
-def create_chunk(article: Dict[str, Any], newsletter_name: str) -> Optional[Chunk]:
-    """ Builds out Chunk object for sequential processing path """
-    try:
-        title = article["title"]
-        url = article["url"]
-        content = article["content"]    
-
-        combined_text = f"Title: {title}\n\nSource: {url}\n\nContent: {content}"
-
-        embedding = prepare_embeddings(combined_text)
-        chunk = Chunk(
-            id=str(uuid.uuid4()),
-            newsletter=newsletter_name,
-            url=url,
-            title=title,
-            text=combined_text,
-            embeddings=embedding)
-
-        return chunk
-    except Exception as e:
-        daily_logger.warning(f"Failed to create chunk for {article.get('url', 'unknown')}: {str(e)}")
-        return None
-    
-async def chunk_articles_gpu(all_articles: Dict[str, List[Dict[str, Any]]]) -> int:
-    """ GPU/CUDA available so does batch processing """
-    articles_combined = []
+def drop_near_duplicates(all_articles: Dict[str, List[Dict[str, Any]]]) -> None:
+    """
+    Removes articles whose content is a near-duplicate (MinHash Jaccard >= config.near_duplicate_threshold) of an article
+    already in the store or seen earlier in this run, before anything is embedded. Feeds are visited in newsletter_urls.json
+    order, so the first feed listed keeps its copy. Kept articles get their signature under "minhash".
+    """
+    hasher = MinHasher(num_perm=config.minhash_permutations)
+    index = NearDuplicateIndex(hasher, threshold=config.near_duplicate_threshold, bands=config.minhash_bands)
+    for chunk in vector_store.chunks:
+        signature = getattr(chunk, "minhash", None)
+        if signature:
+            index.add(decode_signature(signature), f"{chunk.title} ({chunk.newsletter})")
+
     for newsletter_name, articles in all_articles.items():
+        kept = []
         for article in articles:
-            articles_combined.append((article, newsletter_name))
-
-    if not articles_combined:
-        return 0
-
+            signature = hasher.signature(article["content"])
+            duplicate_of = index.find(signature)
+            if duplicate_of is not None:
+                articles_skipped["near_duplicates"] += 1
+                daily_logger.info(f"Dropping near-duplicate {article['title']} ({newsletter_name}) of {duplicate_of}")
+                continue
+            index.add(signature, f"{article['title']} ({newsletter_name})")
+            article["minhash"] = encode_signature(signature)
+            kept.append(article)
+        all_articles[newsletter_name] = kept
+
+async def attach_summaries(all_articles: Dict[str, List[Dict[str, Any]]]) -> int:
+    """ Summarizes this run's embedded articles and stores the summary on every passage of the article; returns the count """
+    articles = [article for articles in all_articles.values() for article in articles if article.get("article_id")]
+    summaries = await summarize_articles(articles)
+    for chunk in vector_store.chunks:
+        summary = summaries.get(getattr(chunk, "article_id", None))
+        if summary:
+            chunk.summary = summary
+    return len(summaries)
+
+def prepare_passages(articles_combined: List[tuple]) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """ Splits every article into token-window passages; returns the flat passage texts and per-passage metadata """
     texts = []
     all_metadata = []
+    passage_stats.update({"articles": 0, "passages": 0, "capped": 0})
 
     for article, newsletter_name in articles_combined:
         try:
-            title = article["title"]
-            url = article["url"]
-            content = article["content"]    
-            combined_text = f"Title: {title}\n\nSource: {url}\n\nContent: {content}"
-            
-            texts.append(combined_text)
-            all_metadata.append({
-                "newsletter": newsletter_name,
-                "url": url,
-                "title": title,
-                "text": combined_text
-            })
+            passages, capped = split_passages(article["title"], article["url"], article["content"])
         except Exception as e:
             daily_logger.warning(f"Failed to prepare article: {str(e)}")
             continue
 
+        article_id = str(uuid.uuid4())
+        article["article_id"] = article_id
+        for passage_index, passage in enumerate(passages):
+            texts.append(passage)
+            all_metadata.append({
+                "newsletter": newsletter_name,
+                "url": article["url"],
+                "title": article["title"],
+                "text": passage,
+                "content_hash": article.get("content_hash"),
+                "article_id": article_id,
+                "passage_index": passage_index,
+                # article-level fingerprint, stored once on the first passage for the next run's near-duplicate check
+                "minhash": article.get("minhash") if passage_index == 0 else None,
+                "published_at": article.get("published_at"),
+                "source_type": article.get("source_type")
+            })
+        passage_stats["articles"] += 1
+        passage_stats["passages"] += len(passages)
+        passage_stats["capped"] += int(capped)
+    return texts, all_metadata
+
+async def chunk_articles_batched(
+        all_articles: Dict[str, List[Dict[str, Any]]],
+        embed_texts: Callable[[List[str]], List[np.ndarray]],
+        device_label: str
+    ) -> int:
+    """
+    Splits every article into passages and embeds all of them in one call to the batched engine [embed_texts] (GPU or CPU),
+    so cost follows the total token count rather than the number of articles. Each passage is stored as its own Chunk,
+    linked to its article by article_id.
+    """
+    articles_combined = []
+    for newsletter_name, articles in all_articles.items():
+        for article in articles:
+            articles_combined.append((article, newsletter_name))
+
+    if not articles_combined:
+        return 0
+
+    texts, all_metadata = await asyncio.to_thread(prepare_passages, articles_combined)
+
     if not texts:
         return 0
     
-    daily_logger.info(f"Starting GPU embedding for {len(texts)} articles")
+    daily_logger.info(f"Starting {device_label} embedding for {len(texts)} passages from {passage_stats['articles']} articles")
 
     try:
-        embeddings_batch = await asyncio.to_thread(prepare_embeddings_gpu, texts)
+        embeddings_batch = await asyncio.to_thread(embed_texts, texts)
 
         chunks_by_newsletter = {}
         chunks_processed = 0
+        ingested_at = time.time()
 
         for embedding, metadata in zip(embeddings_batch, all_metadata):
             try:
@@ -314,7 +544,14 @@ async def chunk_articles_gpu(all_articles: Dict[str, List[Dict[str, Any]]]) -> i
                     url=metadata["url"],
                     title=metadata["title"],
                     text=metadata["text"],
-                    embeddings=embedding
+                    embeddings=embedding,
+                    content_hash=metadata["content_hash"],
+                    ingested_at=ingested_at,
+                    article_id=metadata["article_id"],
+                    passage_index=metadata["passage_index"],
+                    minhash=metadata["minhash"],
+                    published_at=metadata["published_at"],
+                    source_type=metadata["source_type"]
                 )
 
                 if newsletter_name not in chunks_by_newsletter:
@@ -326,42 +563,8 @@ async def chunk_articles_gpu(all_articles: Dict[str, List[Dict[str, Any]]]) -> i
         
         for newsletter_name, chunks in chunks_by_newsletter.items():
             vector_store.add_chunks(newsletter_name, chunks)
+            daily_logger.info(f"Stored {len(chunks)} passages from {newsletter_name} to vector store")
         return chunks_processed
     except Exception as e:
-        daily_logger.error(f"Multiprocessing chunking failed: {str(e)}")
+        daily_logger.error(f"Batched {device_label} chunking failed: {str(e)}")
         return 0
-
-async def chunk_articles_sequential(all_articles: Dict[str, List[Dict[str, Any]]]) -> int:
-    """
-    Sequential processing - (CPU fallback bc GPU/CUDA wasn't found)
-    """
-    try:
-        chunks_processed = 0
-        chunk_tasks = []
-
-        for newsletter_name, articles in all_articles.items():
-            for article in articles:
-                task = asyncio.create_task(asyncio.to_thread(create_chunk, article, newsletter_name))
-                chunk_tasks.append(task)
-        chunks = await asyncio.gather(*chunk_tasks, return_exceptions=True)
-
-        chunks_by_newsletter = {}
-
-        for chunk in chunks:
-            if isinstance(chunk, Exception):
-                daily_logger.debug(f"Failed to create chunk: {chunk}")
-            elif chunk:
-                newsletter_name = chunk.newsletter
-                if newsletter_name not in chunks_by_newsletter:
-                    chunks_by_newsletter[newsletter_name] = []
-                chunks_by_newsletter[newsletter_name].append(chunk)
-                chunks_processed += 1
-
-        for newsletter_name, chunks in chunks_by_newsletter.items():
-            vector_store.add_chunks(newsletter_name, chunks)
-            daily_logger.info(f"Stored {len(chunks)} articles from {newsletter_name} to vector store")
-
-        return chunks_processed
-    except Exception as e:
-        daily_logger.error(f"Failed to embed/build chunks sequentially: {str(e)}")
-        return chunks_processed
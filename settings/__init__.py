@@ -1,3 +1,4 @@
 from .app_config import Config
 from .app_logger import Logger
-from .vector_store import VectorStore, Chunk
\ No newline at end of file
+from .model_resources import ModelResources
+from .vector_store import VectorStore, Chunk, SearchHit, SearchFilter
\ No newline at end of file
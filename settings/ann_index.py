@@ -0,0 +1,99 @@
+import numpy as np
+from typing import Optional, Tuple
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """ Positions of the [k] highest [scores], most similar first, via argpartition instead of a full sort """
+    n = scores.shape[0]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        idx = np.argpartition(scores, n - k)[n - k:]
+    else:
+        idx = np.arange(n)
+    return idx[np.argsort(scores[idx])[::-1]]
+
+def _assign(matrix: np.ndarray, centroids: np.ndarray, block_size: int = 65536) -> np.ndarray:
+    """ Nearest (max inner product) centroid per row, in blocks so the score matrix stays small """
+    assign = np.empty(matrix.shape[0], dtype=np.int32)
+    for start in range(0, matrix.shape[0], block_size):
+        block = np.asarray(matrix[start:start + block_size], dtype=np.float32)
+        assign[start:start + block_size] = np.argmax(block @ centroids.T, axis=1)
+    return assign
+
+def spherical_kmeans(matrix: np.ndarray, n_lists: int, iters: int, rng: np.random.Generator) -> np.ndarray:
+    """ k-means on L2-normalized vectors (cosine), returning normalized centroids """
+    n = matrix.shape[0]
+    centroids = np.array(matrix[rng.choice(n, n_lists, replace=False)], dtype=np.float32)
+    for _ in range(iters):
+        assign = _assign(matrix, centroids)
+        counts = np.bincount(assign, minlength=n_lists)
+        order = np.argsort(assign, kind="stable")
+        non_empty = np.flatnonzero(counts)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[non_empty]
+        sums = np.add.reduceat(np.asarray(matrix[order], dtype=np.float32), starts, axis=0)
+        centroids[non_empty] = sums
+        empty = np.flatnonzero(counts == 0)
+        if empty.size:
+            # re-seed dead lists with random points so every list stays useful
+            centroids[empty] = matrix[rng.choice(n, empty.size, replace=False)]
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        centroids /= np.maximum(norms, 1e-12)
+    return centroids
+
+class IVFIndex:
+    """
+    Inverted-file ANN index over the VectorStore embedding matrix.
+    Rows are clustered around k-means centroids; a query scores the centroids, then only scans the rows of the [nprobe]
+    closest lists. Lists are stored as one int32 row permutation plus offsets so the whole index is two flat arrays.
+    """
+    def __init__(self, centroids: np.ndarray, list_offsets: np.ndarray, list_rows: np.ndarray):
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_rows = list_rows
+
+    @property
+    def num_rows(self) -> int:
+        return int(self.list_rows.shape[0])
+
+    @property
+    def n_lists(self) -> int:
+        return int(self.centroids.shape[0])
+
+    @classmethod
+    def build(cls, matrix: np.ndarray, n_lists: Optional[int] = None, iters: int = 20,
+              train_size_per_list: int = 256, seed: int = 0) -> 'IVFIndex':
+        n = matrix.shape[0]
+        n_lists = min(n, n_lists or max(1, int(np.sqrt(n))))
+        rng = np.random.default_rng(seed)
+        train_size = min(n, n_lists * train_size_per_list)
+        train = matrix if train_size == n else matrix[np.sort(rng.choice(n, train_size, replace=False))]
+        centroids = spherical_kmeans(train, n_lists, iters, rng)
+
+        assign = _assign(matrix, centroids)
+        list_rows = np.argsort(assign, kind="stable").astype(np.int32)
+        list_offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        list_offsets[1:] = np.cumsum(np.bincount(assign, minlength=n_lists))
+        return cls(centroids, list_offsets, list_rows)
+
+    def search(self, matrix: np.ndarray, query: np.ndarray, k: int, nprobe: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns:
+            (row indices into [matrix], their cosine scores), most similar first
+        """
+        probe = top_k_indices(self.centroids @ query, nprobe)
+        rows = np.concatenate([self.list_rows[self.list_offsets[c]:self.list_offsets[c + 1]] for c in probe])
+        if rows.size == 0:
+            return rows, np.empty(0, dtype=np.float32)
+        scores = matrix[rows] @ query
+        best = top_k_indices(scores, k)
+        return rows[best], scores[best]
+
+    def save(self, path: str) -> None:
+        with open(path, 'wb') as f:
+            np.savez(f, centroids=self.centroids, list_offsets=self.list_offsets, list_rows=self.list_rows)
+
+    @classmethod
+    def load(cls, path: str) -> 'IVFIndex':
+        with np.load(path) as arrays:
+            return cls(arrays["centroids"], arrays["list_offsets"], arrays["list_rows"])
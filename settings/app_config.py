@@ -1,6 +1,5 @@
 import json
 from typing import Optional
-from transformers import AutoTokenizer, AutoModel
 
 """ cls refers to the class itself bc of decorator whereas self refers to the instance"""
 class Config:
@@ -13,12 +12,9 @@ class Config:
             with open('settings/config.json', 'r') as f:
                 data = json.load(f)
             
+            # plain settings only; the tokenizer/model named here are loaded lazily by ModelResources
             for key, value in data.items():
                 setattr(self, key, value)
-
-            self.tokenizer = AutoTokenizer.from_pretrained(self.tokenizer)
-            self.embedding_model = AutoModel.from_pretrained(self.embedding_model)
-            self.embedding_model.eval()
             Config._initialized = True
 
     def __new__(cls) -> 'Config':
@@ -0,0 +1,94 @@
+import json
+import os
+import threading
+import numpy as np
+from typing import Any, Callable, Dict, List, Tuple
+
+EMBEDDINGS_FILE = "embeddings.npy"
+TEXTS_FILE = "texts.bin"
+TEXT_OFFSETS_FILE = "text_offsets.npy"
+METADATA_FILE = "metadata.json"
+FORMAT_VERSION = 1
+
+class TextColumn:
+    """
+    Article texts stored back to back as UTF-8 in one file with an offsets array (row i is bytes offsets[i]:offsets[i+1]).
+    The file is memory-mapped (read_columnar maps it when the store opens, so the mapping outlives the generation's
+    directory being pruned) and only the rows that are actually read (the top-k hits) get paged in.
+    """
+    def __init__(self, path: str, offsets: np.ndarray):
+        self.path = path
+        self.offsets = offsets
+        self._data = None
+        self._lock = threading.Lock()
+
+    def open(self) -> None:
+        self._mapped()
+
+    def _mapped(self) -> np.ndarray:
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    if os.path.getsize(self.path) == 0:
+                        self._data = np.empty(0, dtype=np.uint8)
+                    else:
+                        self._data = np.memmap(self.path, dtype=np.uint8, mode='r')
+        return self._data
+
+    def get(self, row: int) -> str:
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        return self._mapped()[start:end].tobytes().decode("utf-8")
+
+def _replace_atomically(path: str, write: Callable[[Any], None]) -> None:
+    """ Writes to a temp file and renames over [path] so readers (and live mmaps of the old file) never see a partial file """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+def write_columnar(path: str, matrix: np.ndarray, texts: List[str], columns: Dict[str, List[Any]]) -> int:
+    """
+    Writes the columnar store to directory [path]: float32 embedding matrix, text sidecar + offsets, and JSON metadata columns.
+    metadata.json is written last since it is what readers open first.
+
+    Returns:
+        Total size of the store in bytes
+    """
+    os.makedirs(path, exist_ok=True)
+    encoded = [text.encode("utf-8") for text in texts]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+
+    def write_texts(f) -> None:
+        for b in encoded:
+            f.write(b)
+
+    _replace_atomically(os.path.join(path, EMBEDDINGS_FILE), lambda f: np.save(f, matrix))
+    _replace_atomically(os.path.join(path, TEXTS_FILE), write_texts)
+    _replace_atomically(os.path.join(path, TEXT_OFFSETS_FILE), lambda f: np.save(f, offsets))
+    metadata = {
+        "format_version": FORMAT_VERSION,
+        "count": len(texts),
+        "dim": int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+        "columns": columns
+    }
+    _replace_atomically(os.path.join(path, METADATA_FILE), lambda f: f.write(json.dumps(metadata).encode("utf-8")))
+
+    return sum(os.path.getsize(os.path.join(path, name)) for name in (EMBEDDINGS_FILE, TEXTS_FILE, TEXT_OFFSETS_FILE, METADATA_FILE))
+
+def read_columnar(path: str) -> Tuple[np.ndarray, TextColumn, Dict[str, List[Any]]]:
+    """
+    Opens the columnar store in [path] without reading embeddings or texts into memory
+
+    Returns:
+        (read-only memory-mapped embedding matrix, lazy text column, metadata columns)
+    """
+    with open(os.path.join(path, METADATA_FILE), 'r') as f:
+        metadata = json.load(f)
+    matrix = np.load(os.path.join(path, EMBEDDINGS_FILE), mmap_mode='r')
+    offsets = np.load(os.path.join(path, TEXT_OFFSETS_FILE))
+    texts = TextColumn(os.path.join(path, TEXTS_FILE), offsets)
+    # map now rather than on the first read, which could come after a newer save pruned this generation's files
+    texts.open()
+    return matrix, texts, metadata["columns"]
@@ -0,0 +1,122 @@
+import re
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Tuple
+from settings.ann_index import top_k_indices
+
+# words plus dotted/hyphenated compounds ("qwen2.5", "gpt-4o", "2401.12345") kept whole
+_TOKEN = re.compile(r"\w+(?:[.\-]\w+)*")
+_SEPARATORS = re.compile(r"[.\-]")
+
+def tokenize(text: str) -> List[str]:
+    """ Lowercased tokens; a compound is indexed both whole and by its parts so "Llama-4" also matches "llama 4" """
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        tokens.append(token)
+        if _SEPARATORS.search(token):
+            tokens.extend(part for part in _SEPARATORS.split(token) if part)
+    return tokens
+
+class BM25Index:
+    """
+    Okapi BM25 inverted index over the VectorStore rows.
+    Posting lists are one flat int32 row array plus a float32 array of precomputed BM25 term weights (idf * saturated tf),
+    addressed by per-term offsets, so a lookup is a few array slices and one bincount with no per-document Python work.
+    The vocabulary is saved as one UTF-8 blob plus offsets (like the store's TextColumn), not a fixed-width string array
+    that would pad every term to the longest compound.
+    """
+    def __init__(self, terms: List[str], term_offsets: np.ndarray, posting_rows: np.ndarray, posting_weights: np.ndarray,
+                 num_docs: int):
+        self.terms = terms
+        self.term_offsets = term_offsets
+        self.posting_rows = posting_rows
+        self.posting_weights = posting_weights
+        self.num_docs = num_docs
+        self.term_ids: Dict[str, int] = {term: i for i, term in enumerate(terms)}
+
+    @property
+    def num_rows(self) -> int:
+        return self.num_docs
+
+    @classmethod
+    def build(cls, texts: Iterable[str], k1: float = 1.2, b: float = 0.75) -> 'BM25Index':
+        term_ids: Dict[str, int] = {}
+        doc_term_ids = []
+        doc_term_counts = []
+        doc_lengths = []
+        for text in texts:
+            tokens = tokenize(text)
+            ids = np.fromiter((term_ids.setdefault(token, len(term_ids)) for token in tokens), dtype=np.int64, count=len(tokens))
+            unique, counts = np.unique(ids, return_counts=True)
+            doc_term_ids.append(unique)
+            doc_term_counts.append(counts)
+            doc_lengths.append(len(tokens))
+
+        num_docs = len(doc_lengths)
+        terms = list(term_ids.keys())
+        if num_docs == 0 or not term_ids:
+            return cls(terms, np.zeros(len(term_ids) + 1, dtype=np.int64), np.empty(0, dtype=np.int32),
+                       np.empty(0, dtype=np.float32), num_docs)
+
+        rows = np.repeat(np.arange(num_docs, dtype=np.int32), [len(ids) for ids in doc_term_ids])
+        ids = np.concatenate(doc_term_ids)
+        tf = np.concatenate(doc_term_counts).astype(np.float32)
+        lengths = np.asarray(doc_lengths, dtype=np.float32)
+
+        df = np.bincount(ids, minlength=len(term_ids)).astype(np.float32)
+        idf = np.log1p((num_docs - df + 0.5) / (df + 0.5))
+        norm = k1 * (1 - b + b * lengths[rows] / max(float(lengths.mean()), 1e-9))
+        weights = idf[ids] * tf * (k1 + 1) / (tf + norm)
+
+        # group postings by term (stable, so rows stay ascending within each list)
+        order = np.argsort(ids, kind="stable")
+        term_offsets = np.zeros(len(term_ids) + 1, dtype=np.int64)
+        term_offsets[1:] = np.cumsum(df.astype(np.int64))
+        return cls(terms, term_offsets, rows[order], weights[order].astype(np.float32), num_docs)
+
+    def search(self, query: str, k: int, allowed_rows: Optional[np.ndarray] = None,
+               max_df_fraction: float = 0.5) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Terms appearing in more than [max_df_fraction] of rows carry almost no idf and have the longest lists, so they are
+        skipped. [allowed_rows] (sorted) restricts results to a filtered slice.
+
+        Returns:
+            (row indices, BM25 scores), best first
+        """
+        slices = []
+        for term in set(tokenize(query)):
+            term_id = self.term_ids.get(term)
+            if term_id is None:
+                continue
+            start, end = self.term_offsets[term_id], self.term_offsets[term_id + 1]
+            if end - start > max_df_fraction * self.num_docs:
+                continue
+            slices.append((start, end))
+        if not slices:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        rows = np.concatenate([self.posting_rows[start:end] for start, end in slices])
+        weights = np.concatenate([self.posting_weights[start:end] for start, end in slices])
+        matched, inverse = np.unique(rows, return_inverse=True)
+        scores = np.bincount(inverse, weights=weights).astype(np.float32)
+        if allowed_rows is not None:
+            keep = np.isin(matched, allowed_rows)
+            matched, scores = matched[keep], scores[keep]
+        best = top_k_indices(scores, k)
+        return matched[best].astype(np.int64), scores[best]
+
+    def save(self, path: str) -> None:
+        encoded = [term.encode("utf-8") for term in self.terms]
+        vocab_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        vocab_offsets[1:] = np.cumsum([len(b) for b in encoded])
+        vocab_bytes = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        with open(path, 'wb') as f:
+            np.savez(f, vocab_bytes=vocab_bytes, vocab_offsets=vocab_offsets, term_offsets=self.term_offsets,
+                     posting_rows=self.posting_rows, posting_weights=self.posting_weights, num_docs=np.asarray(self.num_docs))
+
+    @classmethod
+    def load(cls, path: str) -> 'BM25Index':
+        with np.load(path) as arrays:
+            blob = arrays["vocab_bytes"].tobytes()
+            offsets = arrays["vocab_offsets"].tolist()
+            terms = [blob[start:end].decode("utf-8") for start, end in zip(offsets, offsets[1:])]
+            return cls(terms, arrays["term_offsets"], arrays["posting_rows"], arrays["posting_weights"], int(arrays["num_docs"]))
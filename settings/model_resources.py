@@ -0,0 +1,62 @@
+import threading
+from typing import Any, Optional
+from settings.app_config import Config
+
+class ModelResources:
+    """
+    Singleton holding the HuggingFace tokenizer and embedding model named in config.json.
+    Nothing is imported or loaded until the first embedding call (or an explicit warm()), so processes that only need
+    settings (web startup, store reloads, benchmarks, extraction workers) never pay for transformers or the model.
+    """
+    _instance: Optional['ModelResources'] = None
+    _initialized: bool = False
+
+    def __init__(self):
+        if not ModelResources._initialized:
+            self._tokenizer: Any = None
+            self._model: Any = None
+            self._lock = threading.Lock()
+            ModelResources._initialized = True
+
+    def __new__(cls) -> 'ModelResources':
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    @classmethod
+    def get_instance(cls) -> 'ModelResources':
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def _load(self) -> None:
+        with self._lock:
+            if self._model is None:
+                from transformers import AutoTokenizer, AutoModel
+                config = Config.get_instance()
+                tokenizer = AutoTokenizer.from_pretrained(config.tokenizer)
+                model = AutoModel.from_pretrained(config.embedding_model)
+                model.eval()
+                self._tokenizer = tokenizer
+                self._model = model
+
+    def warm(self) -> None:
+        """ Loads the model ahead of the first request (e.g. from a startup hook) """
+        if self._model is None:
+            self._load()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    @property
+    def tokenizer(self) -> Any:
+        if self._tokenizer is None:
+            self._load()
+        return self._tokenizer
+
+    @property
+    def model(self) -> Any:
+        if self._model is None:
+            self._load()
+        return self._model
@@ -0,0 +1,73 @@
+import os
+import numpy as np
+from typing import Dict, List, Optional
+
+class QuantizedMatrix:
+    """
+    Compact copy of the embedding matrix used for the first, approximate pass of a search.
+        - "int8": per-row symmetric scaling (row = codes * scale), 4x smaller than float32
+        - "float16": plain half precision, 2x smaller
+    Scores from it only pick candidates; they are re-scored against the full-precision rows before any cutoff is applied.
+    The win is memory: with the memory-mapped columnar store the scan touches only the codes, not the float32 matrix.
+    Latency is at best on par with the exact scan (numpy has no int8 BLAS), and float16 is far slower since every block
+    has to be converted in software (see benchmarks/ann_recall.py --quantization).
+    """
+    def __init__(self, codes: np.ndarray, scales: Optional[np.ndarray] = None):
+        self.codes = codes
+        self.scales = scales
+
+    @property
+    def mode(self) -> str:
+        return "int8" if self.codes.dtype == np.int8 else "float16"
+
+    @property
+    def num_rows(self) -> int:
+        return int(self.codes.shape[0])
+
+    @classmethod
+    def from_float(cls, matrix: np.ndarray, mode: str, block_size: int = 65536) -> 'QuantizedMatrix':
+        if mode == "float16":
+            return cls(np.asarray(matrix, dtype=np.float16))
+        if mode != "int8":
+            raise ValueError(f"Unknown embedding quantization mode: {mode}")
+
+        codes = np.empty(matrix.shape, dtype=np.int8)
+        scales = np.empty(matrix.shape[0], dtype=np.float32)
+        for start in range(0, matrix.shape[0], block_size):
+            block = np.asarray(matrix[start:start + block_size], dtype=np.float32)
+            block_scales = np.abs(block).max(axis=1) / 127.0
+            block_scales[block_scales == 0] = 1.0
+            codes[start:start + block_size] = np.clip(np.rint(block / block_scales[:, None]), -127, 127)
+            scales[start:start + block_size] = block_scales
+        return cls(codes, scales)
+
+    def scores(self, query: np.ndarray, block_size: int = 512) -> np.ndarray:
+        """
+        Approximate inner products, converting codes block by block. Blocks are kept cache-sized (512 x 384 float32 is
+        768 KiB) so the converted rows are multiplied before they leave the cache instead of streaming a temporary
+        larger than the float32 matrix itself through memory
+        """
+        out = np.empty(self.num_rows, dtype=np.float32)
+        for start in range(0, self.num_rows, block_size):
+            out[start:start + block_size] = self.codes[start:start + block_size].astype(np.float32) @ query
+        if self.scales is not None:
+            out *= self.scales
+        return out
+
+    def files(self, prefix: str) -> Dict[str, Optional[np.ndarray]]:
+        """ .npy path -> array to store there (None: the file must not exist, e.g. scales in float16 mode) """
+        return {f"{prefix}.codes.npy": self.codes, f"{prefix}.scales.npy": self.scales}
+
+    @staticmethod
+    def all_files(prefix: str) -> List[str]:
+        return [f"{prefix}.codes.npy", f"{prefix}.scales.npy"]
+
+    @classmethod
+    def load(cls, prefix: str) -> 'QuantizedMatrix':
+        codes = np.load(f"{prefix}.codes.npy", mmap_mode='r')
+        scales = np.load(f"{prefix}.scales.npy") if codes.dtype == np.int8 else None
+        return cls(codes, scales)
+
+    @staticmethod
+    def exists(prefix: str) -> bool:
+        return os.path.exists(f"{prefix}.codes.npy")
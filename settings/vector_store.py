@@ -1,13 +1,112 @@
 import joblib
 import numpy as np
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, NamedTuple, Any, Tuple
 import os
+import shutil
+import time
 from settings import Config, Logger
+from settings.columnar_store import TextColumn, read_columnar, write_columnar
+from settings.ann_index import IVFIndex, top_k_indices
+from settings.quantization import QuantizedMatrix
+from settings.lexical_index import BM25Index
+from utils.metrics import near_duplicate_hits_dropped
 
 config = Config.get_instance()
 daily_logger = Logger.get_daily_logger("data_fetch")
 runtime_logger = Logger.get_runtime_logger("chatbot")
 
+CURRENT_GENERATION_FILE = "CURRENT"
+GENERATIONS_DIR = "generations"
+
+class StoreState(NamedTuple):
+    """
+    One immutable snapshot of everything a query reads. VectorStore replaces the whole state in a single reference flip,
+    so a query that grabbed the old state finishes on it while new queries see the new one.
+    """
+    data: Dict[str, List['Chunk']]
+    # contiguous search index parallel to chunks (row i <-> chunks[i])
+    embedding_matrix: np.ndarray
+    ids: np.ndarray
+    newsletters: np.ndarray
+    chunks: List['Chunk']
+    # row partitions for filtered search (sorted row indices per newsletter / source type / date bucket)
+    newsletter_rows: Dict[str, np.ndarray]
+    source_rows: Dict[str, np.ndarray]
+    date_bucket_rows: Dict[int, np.ndarray]
+    # publish time per row (ingest time when the feed gave none), for the partial buckets at a date filter's edges
+    published: np.ndarray
+    # rows of every article's passages (article_key -> ascending rows), to rebuild a hit's full text for the prompt
+    article_rows: Dict[str, np.ndarray]
+    # optional search structures; only valid for exactly these rows so any row change drops them until rebuilt
+    ann_index: Optional[IVFIndex] = None
+    quantized: Optional[QuantizedMatrix] = None
+    lexical_index: Optional[BM25Index] = None
+    # bumped whenever the searchable contents change so caches of query results can invalidate themselves
+    generation: int = 0
+    # on-disk generation this state was loaded from / saved to
+    generation_id: Optional[str] = None
+    path: Optional[str] = None
+    loaded_at: Optional[float] = None
+    load_seconds: Optional[float] = None
+
+    @classmethod
+    def build(cls, data: Dict[str, List['Chunk']], matrix: np.ndarray, chunks: List['Chunk'],
+              previous: Optional['StoreState'] = None) -> 'StoreState':
+        published = np.asarray([published_time(chunk) for chunk in chunks], dtype=np.float64)
+        bucket_seconds = config.date_bucket_days * 86400
+        return cls(
+            data=data,
+            embedding_matrix=matrix,
+            ids=np.asarray([chunk.id for chunk in chunks], dtype=object),
+            newsletters=np.asarray([chunk.newsletter for chunk in chunks], dtype=object),
+            chunks=chunks,
+            newsletter_rows=_partition(chunk.newsletter for chunk in chunks),
+            source_rows=_partition(source_type(chunk) for chunk in chunks),
+            date_bucket_rows=_partition(int(t // bucket_seconds) for t in published),
+            published=published,
+            article_rows=_partition(article_key(chunk) for chunk in chunks),
+            generation=previous.generation + 1 if previous is not None else 0,
+            generation_id=previous.generation_id if previous is not None else None,
+            path=previous.path if previous is not None else None
+        )
+
+    @classmethod
+    def empty(cls) -> 'StoreState':
+        return cls.build({}, np.empty((0, 0), dtype=np.float32), [])
+
+    def filter_rows(self, search_filter: 'SearchFilter') -> np.ndarray:
+        """
+        Sorted rows matching [search_filter], assembled from the partitions so a filtered query only touches its own slices.
+        Date buckets fully inside [since, until] are taken whole; only the two edge buckets are checked row by row.
+        """
+        selections = []
+        if search_filter.newsletters:
+            parts = [self.newsletter_rows[name] for name in search_filter.newsletters if name in self.newsletter_rows]
+            selections.append(np.sort(np.concatenate(parts)) if parts else _NO_ROWS)
+        if search_filter.source_type:
+            selections.append(self.source_rows.get(search_filter.source_type, _NO_ROWS))
+        if search_filter.since is not None or search_filter.until is not None:
+            since = search_filter.since if search_filter.since is not None else -np.inf
+            until = search_filter.until if search_filter.until is not None else np.inf
+            bucket_seconds = config.date_bucket_days * 86400
+            parts = []
+            for bucket, rows in self.date_bucket_rows.items():
+                start, end = bucket * bucket_seconds, (bucket + 1) * bucket_seconds
+                if end <= since or start > until:
+                    continue
+                if start >= since and end <= until:
+                    parts.append(rows)
+                else:
+                    dates = self.published[rows]
+                    parts.append(rows[(dates >= since) & (dates <= until)])
+            selections.append(np.sort(np.concatenate(parts)) if parts else _NO_ROWS)
+
+        selections.sort(key=len)
+        rows = selections[0]
+        for other in selections[1:]:
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
+
 class VectorStore:
     """
     Singleton
@@ -18,88 +117,652 @@ class VectorStore:
 
     def __init__(self):
         if not VectorStore._initialized:
-            self.data: Optional[Dict[str, List['Chunk']]] = {}
+            self._state: StoreState = StoreState.empty()
             VectorStore._initialized = True
-    
+
     def __new__(cls) -> 'VectorStore':
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
-    
+
+    @property
+    def state(self) -> StoreState:
+        return self._state
+
+    @property
+    def data(self) -> Dict[str, List['Chunk']]:
+        return self._state.data
+
+    @property
+    def embedding_matrix(self) -> np.ndarray:
+        return self._state.embedding_matrix
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._state.ids
+
+    @property
+    def newsletters(self) -> np.ndarray:
+        return self._state.newsletters
+
+    @property
+    def chunks(self) -> List['Chunk']:
+        return self._state.chunks
+
+    @property
+    def ann_index(self) -> Optional[IVFIndex]:
+        return self._state.ann_index
+
+    @property
+    def quantized(self) -> Optional[QuantizedMatrix]:
+        return self._state.quantized
+
+    @property
+    def lexical_index(self) -> Optional[BM25Index]:
+        return self._state.lexical_index
+
+    @property
+    def generation(self) -> int:
+        return self._state.generation
+
     def add_chunks(self, doc_id: str, chunks: List['Chunk']) -> None:
-        if doc_id in self.data:
-            self.data[doc_id].extend(chunks)
+        if not chunks:
+            return
+        state = self._state
+        data = dict(state.data)
+        data[doc_id] = data.get(doc_id, []) + list(chunks)
+
+        rows = np.asarray([chunk.embeddings for chunk in chunks], dtype=np.float32)
+        if state.embedding_matrix.size == 0:
+            matrix = np.ascontiguousarray(rows)
+        else:
+            matrix = np.concatenate([state.embedding_matrix, rows], axis=0)
+        self._state = StoreState.build(data, matrix, state.chunks + list(chunks), state)
+
+    def clear(self) -> None:
+        """ Drops every chunk (start of a full rebuild) """
+        self._state = StoreState.build({}, np.empty((0, 0), dtype=np.float32), [], self._state)
+
+    def _rebuild_state(self, data: Dict[str, List['Chunk']], previous: StoreState) -> StoreState:
+        """ Builds a fresh state (new contiguous matrix) from [data] """
+        chunks = [chunk for document in data.values() for chunk in document]
+        if chunks:
+            matrix = np.ascontiguousarray(np.asarray([chunk.embeddings for chunk in chunks], dtype=np.float32))
         else:
-            self.data[doc_id] = chunks
-    
+            matrix = np.empty((0, 0), dtype=np.float32)
+        return StoreState.build(data, matrix, chunks, previous)
+
+    def expire(self, cutoff: float) -> int:
+        """
+        Drops chunks published before [cutoff] (unix time) and rebuilds the search index. Age is the feed's publish time,
+        falling back to ingest time (published_time()), so re-listing an old entry doesn't keep it alive. Chunks from
+        stores written before either timestamp existed have neither and are treated as expired.
+
+        Returns:
+            Number of chunks removed
+        """
+        state = self._state
+        removed = 0
+        data = {}
+        for doc_id, chunks in state.data.items():
+            kept = [chunk for chunk in chunks if published_time(chunk) >= cutoff]
+            removed += len(chunks) - len(kept)
+            if kept:
+                data[doc_id] = kept
+        if removed:
+            self._state = self._rebuild_state(data, state)
+        return removed
+
+    def build_search_indexes(self) -> None:
+        """ Builds the optional search structures over the finished matrix (end of parse_feeds) """
+        self.build_ann_index()
+        self.build_quantized()
+        self.build_lexical_index()
+
+    def build_quantized(self) -> None:
+        state = self._state
+        if quantization_mode() is None or not state.chunks:
+            self._state = state._replace(quantized=None)
+            return
+        quantized = QuantizedMatrix.from_float(state.embedding_matrix, config.embedding_quantization)
+        self._state = state._replace(quantized=quantized)
+        daily_logger.info(f"Quantized {quantized.num_rows} embeddings to {quantized.mode}")
+
+    def build_lexical_index(self) -> None:
+        """ BM25 over each passage's title + text (the title is counted again so it weighs more than body mentions) """
+        state = self._state
+        if config.retrieval_mode != "hybrid" or not state.chunks:
+            self._state = state._replace(lexical_index=None)
+            return
+        lexical_index = BM25Index.build(f"{chunk.title} {chunk.text}" for chunk in state.chunks)
+        self._state = state._replace(lexical_index=lexical_index)
+        daily_logger.info(f"Built BM25 index with {len(lexical_index.terms)} terms over {lexical_index.num_rows} chunks")
+
+    def build_ann_index(self) -> None:
+        """ Builds the IVF index over the current matrix (end of parse_feeds); skipped for corpora small enough to scan exactly """
+        state = self._state
+        num_chunks = len(state.chunks)
+        if not config.ann_enabled or num_chunks < config.ann_min_corpus:
+            self._state = state._replace(ann_index=None)
+            daily_logger.info(f"Skipping ANN index for {num_chunks} chunks (exact scan below {config.ann_min_corpus})")
+            return
+        ann_index = IVFIndex.build(state.embedding_matrix, n_lists=config.ann_n_lists, iters=config.ann_kmeans_iters)
+        self._state = state._replace(ann_index=ann_index)
+        daily_logger.info(f"Built IVF index with {ann_index.n_lists} lists over {num_chunks} chunks")
+
     def cosine_similarity(self, a: np.ndarray, b: np.ndarray) -> float:
         return np.dot(a, b)
-    
-    def retrieve_top_k(self, query_embedding: np.ndarray) -> Optional[List['Chunk']]:
+
+    def retrieve_top_k(self, query_embedding: np.ndarray, search_filter: Optional['SearchFilter'] = None,
+                       query_text: Optional[str] = None) -> List['SearchHit']:
         """
-        Performs cosine similarity to retrieve the top_k articles that are most relavant to the user's query
+        Performs cosine similarity to retrieve the top_k articles that are most relavant to the user's query.
+        Embeddings are L2-normalized so a single matrix-vector product gives every cosine score at once.
+        Rows are passages, so the hits are grouped by article and each article is represented by its best-scoring passage.
+        With a [search_filter] only the rows in its partitions are scored (exactly; the slice is small by construction).
+        In config.retrieval_mode "hybrid" the dense candidates are fused with BM25 matches for [query_text] (see _fuse).
+        Read-only over one state snapshot (scores live in the returned hits) so concurrent queries and reloads are safe.
         """
-        similars = []
-        for doc_id, document in self.data.items():
-            for chunk in document:
-                similarity_score = self.cosine_similarity(query_embedding, chunk.embeddings)
-                chunk.set_similarity_score(similarity_score)
-                similars.append((doc_id, chunk, similarity_score))
+        state = self._state
+        matrix, chunks, ann_index, quantized = state.embedding_matrix, state.chunks, state.ann_index, state.quantized
+        num_chunks = min(len(chunks), matrix.shape[0])
+        if num_chunks == 0:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        # several passages of one article can rank together, so search deeper than top_k and group afterwards
+        num_passages = min(num_chunks, config.top_k * config.passage_candidates_per_article)
+        rows = None
+        if search_filter is not None and not search_filter.is_empty():
+            rows = state.filter_rows(search_filter)
+            rows = rows[rows < num_chunks]
+            if len(rows) == 0:
+                return []
+            # rows are sorted so a memory-mapped matrix is read front to back
+            scores = np.asarray(matrix[rows], dtype=np.float32) @ query
+            best = top_k_indices(scores, num_passages)
+            top_idx, top_scores = rows[best], scores[best]
+        elif ann_index is not None and ann_index.num_rows == num_chunks:
+            top_idx, top_scores = ann_index.search(matrix, query, num_passages, config.ann_nprobe)
+        elif quantized is not None and quantized.num_rows == num_chunks:
+            # scan the compact codes, then re-score a small candidate set at full precision before the cutoff
+            # (rows sorted so a memory-mapped matrix is read front to back)
+            candidates = np.sort(top_k_indices(quantized.scores(query), num_passages * config.quantization_rerank_factor))
+            candidate_scores = np.asarray(matrix[candidates], dtype=np.float32) @ query
+            best = top_k_indices(candidate_scores, num_passages)
+            top_idx, top_scores = candidates[best], candidate_scores[best]
+        else:
+            scores = matrix[:num_chunks] @ query
+            # sorted in descending order to access most similar articles first
+            top_idx = top_k_indices(scores, num_passages)
+            top_scores = scores[top_idx]
+
+        lexical_index = state.lexical_index
+        if (config.retrieval_mode == "hybrid" and query_text and lexical_index is not None
+                and lexical_index.num_rows == num_chunks):
+            lexical_idx, lexical_scores = lexical_index.search(query_text, config.lexical_candidates, allowed_rows=rows)
+            if len(lexical_idx):
+                return self._best_per_article(matrix, chunks, *self._fuse(matrix, query, top_idx, top_scores,
+                                                                          lexical_idx, lexical_scores))
+        return self._best_per_article(matrix, chunks, top_idx, top_scores)
+
+    def _fuse(self, matrix: np.ndarray, query: np.ndarray, dense_idx: np.ndarray, dense_scores: np.ndarray,
+              lexical_idx: np.ndarray, lexical_scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Merges dense and BM25 candidates into one ranking. BM25 matches the dense search missed are scored against the
+        query embedding on the spot, so the lexical side acts as a cheap candidate generator and every hit keeps a cosine.
+        config.fusion "rrf" ranks by reciprocal rank fusion (1 / (rrf_k + rank) summed over both lists); "weighted" by
+        cosine + lexical_weight * BM25 normalized to the best match. Lexical matches only need
+        config.lexical_min_similarity to pass instead of the usual 0.6, since an exact name/ID match is strong evidence.
+
+        Returns:
+            (rows, cosine scores, per-row similarity cutoff), in fused order
+        """
+        extra = np.setdiff1d(lexical_idx, dense_idx)
+        candidates = np.concatenate([dense_idx, extra]).astype(np.int64)
+        cosines = np.asarray(dense_scores, dtype=np.float32)
+        if len(extra):
+            cosines = np.concatenate([cosines, np.asarray(matrix[extra], dtype=np.float32) @ query])
+
+        dense_rank = np.empty(len(candidates), dtype=np.float64)
+        dense_rank[np.argsort(-cosines, kind="stable")] = np.arange(1, len(candidates) + 1)
+        lexical_rank = np.full(len(candidates), np.inf)
+        bm25 = np.zeros(len(candidates), dtype=np.float32)
+        position = {int(row): i for i, row in enumerate(candidates)}
+        for rank, (row, score) in enumerate(zip(lexical_idx, lexical_scores), start=1):
+            lexical_rank[position[int(row)]] = rank
+            bm25[position[int(row)]] = score
 
-        # sort in descending order to access most similar articles first
-        similars.sort(key=lambda x: x[2], reverse=True)
+        if config.fusion == "weighted":
+            fused = cosines + config.lexical_weight * bm25 / max(float(bm25.max()), 1e-9)
+        else:
+            fused = 1.0 / (config.rrf_k + dense_rank) + 1.0 / (config.rrf_k + lexical_rank)
+        order = np.argsort(-fused, kind="stable")
+        cutoffs = np.where(np.isfinite(lexical_rank), config.lexical_min_similarity, 0.6)
+        return candidates[order], cosines[order], cutoffs[order]
 
+    def _best_per_article(self, matrix: np.ndarray, chunks: List['Chunk'], top_idx: np.ndarray, top_scores: np.ndarray,
+                          cutoffs: Optional[np.ndarray] = None) -> List['SearchHit']:
+        """
+        Collapses passage hits (in ranked order) to one hit per article, represented by its best-ranked passage, and keeps the
+        top_k articles above the similarity cutoff (0.6, or the per-row [cutoffs] of a fused ranking). A hit whose passage embedding is within config.diversity_max_similarity
+        of one already kept is a syndicated copy of the same story and is skipped so it cannot crowd out other articles.
+        """
         results = []
-        for doc_id, chunk, similarity_score in similars[:config.top_k]:
-            if similarity_score < 0.6:
+        kept_rows = []
+        articles_seen = set()
+        for i, (idx, similarity_score) in enumerate(zip(top_idx, top_scores)):
+            similarity_score = float(similarity_score)
+            if len(results) == config.top_k:
                 break
-            results.append(chunk)
+            if similarity_score < (cutoffs[i] if cutoffs is not None else 0.6):
+                continue
+            chunk = chunks[idx]
+            key = article_key(chunk)
+            if key in articles_seen:
+                continue
+            articles_seen.add(key)
+            row = np.asarray(matrix[idx], dtype=np.float32)
+            if any(float(row @ kept) > config.diversity_max_similarity for kept in kept_rows):
+                near_duplicate_hits_dropped.inc()
+                continue
+            kept_rows.append(row)
+            results.append(SearchHit(chunk=chunk, score=similarity_score))
         return results
 
+    def article_passages(self, chunk: 'Chunk') -> List['Chunk']:
+        """
+        Every stored passage of [chunk]'s article in passage_index order (just [chunk] if the article is no longer in the
+        current state, e.g. expired by a reload since the query ran)
+        """
+        state = self._state
+        rows = state.article_rows.get(article_key(chunk))
+        if rows is None:
+            return [chunk]
+        return sorted((state.chunks[row] for row in rows), key=lambda passage: getattr(passage, "passage_index", 0))
+
     @classmethod
     def get_instance(cls) -> 'VectorStore':
         if cls._instance is None:
             cls._instance = cls()
         return cls._instance
-    
+
     @classmethod
     def reset(cls) -> None:
         cls._instance = None
         cls._initialized = False
-    
 
-    def save(self) -> None: # Run at end of preprocessing when building the VectorStore
+    def status(self) -> Dict[str, Any]:
+        """ Active generation info for the web service """
+        state = self._state
+        return {
+            "generation_id": state.generation_id,
+            "generation": state.generation,
+            "documents": len(state.data),
+            "articles": len({article_key(chunk) for chunk in state.chunks}),
+            "chunks": len(state.chunks),
+            "loaded_at": state.loaded_at,
+            "load_seconds": state.load_seconds,
+            "ann_index": state.ann_index is not None,
+            "quantized": state.quantized.mode if state.quantized is not None else None,
+            "lexical_index": state.lexical_index is not None
+        }
+
+    def latest_generation_id(self) -> Optional[str]:
+        """ Generation currently published on disk (what load() would pick up) """
         try:
-            if self.data:
-                joblib.dump(self.data, config.vector_store, compress=3)
-                daily_logger.info(f"Wrote {len(self.data)} documents out to {config.vector_store}")
+            if config.vector_store_format == "columnar":
+                current_file = os.path.join(config.vector_store_dir, CURRENT_GENERATION_FILE)
+                if not os.path.exists(current_file):
+                    return None
+                with open(current_file, 'r') as f:
+                    return f.read().strip() or None
+            return str(os.stat(config.vector_store).st_mtime_ns)
+        except OSError:
+            return None
+
+    def reload_if_changed(self) -> bool:
+        """
+        Loads and swaps in a newer on-disk generation if one was published. Queries keep running on the old state
+        while the new one loads in the calling (background) thread.
+        """
+        latest = self.latest_generation_id()
+        if latest is None or latest == self._state.generation_id:
+            return False
+        runtime_logger.info(f"New VectorStore generation {latest} found (active: {self._state.generation_id}), reloading")
+        self.load()
+        return self._state.generation_id == latest
+
+    def save(self) -> bool: # Run at end of preprocessing when building the VectorStore
+        """ Returns whether a new generation was written (False for an empty store or a failed write, which are logged) """
+        if config.vector_store_format == "columnar":
+            return self._save_columnar()
+        state = self._state
+        try:
+            if state.data:
+                # write to a temp file and rename so a reader never opens a half-written pickle
+                tmp_path = f"{config.vector_store}.tmp"
+                # the search indexes sit next to the live pickle, so they are staged too and all renamed together
+                moves = [(tmp_path, config.vector_store)]
+                try:
+                    joblib.dump(state.data, tmp_path, compress=3)
+                    moves = self._stage_search_indexes(state, config.vector_store) + moves
+                except BaseException:
+                    _discard_staged(moves)
+                    raise
+                _publish_staged(moves)
+                self._state = state._replace(generation_id=str(os.stat(config.vector_store).st_mtime_ns), path=config.vector_store)
+                daily_logger.info(f"Wrote {len(state.data)} documents out to {config.vector_store}")
                 file_size = os.path.getsize(config.vector_store)
                 daily_logger.info(f"VectorStore is {file_size} bytes")
-            else:
-                daily_logger.warning(f"Cannot save to {config.vector_store} because VectorStore has no contents.")
+                return True
+            daily_logger.warning(f"Cannot save to {config.vector_store} because VectorStore has no contents.")
         except (OSError, TypeError) as e:
             daily_logger.error(f"Error saving to {config.vector_store}: {e}")
+        return False
+
+    def load(self) -> None: # Run at container startup (and on hot reload) to load VectorStore in for use at runtime
+        start = time.perf_counter()
+        if config.vector_store_format == "columnar":
+            state = self._load_columnar()
+        else:
+            state = self._load_joblib()
+        if state is None:
+            return
+        state = self._attach_search_indexes(state)
+        state = state._replace(loaded_at=time.time(), load_seconds=time.perf_counter() - start)
+        # single reference flip: in-flight queries finish on the previous state
+        self._state = state
+        runtime_logger.info(f"Activated VectorStore generation {state.generation_id} ({len(state.chunks)} chunks) in {state.load_seconds:.2f}s")
 
-    def load(self) -> None: # Run at container startup to load VectorStore in for use at runtime
+    def _load_joblib(self) -> Optional[StoreState]:
         try:
-            self.data = joblib.load(config.vector_store)
-            runtime_logger.info(f"Loaded {len(self.data)} documents from {config.vector_store}")
+            generation_id = str(os.stat(config.vector_store).st_mtime_ns)
+            data = joblib.load(config.vector_store)
         except FileNotFoundError as e:
             runtime_logger.error(f"Error reading VectorStore from {config.vector_store}: {e}")
+            return None
+        runtime_logger.info(f"Loaded {len(data)} documents from {config.vector_store}")
+        return self._rebuild_state(data, self._state)._replace(generation_id=generation_id, path=config.vector_store)
+
+    def _save_columnar(self) -> bool:
+        state = self._state
+        generation_id = str(int(time.time() * 1000))
+        generations_root = os.path.join(config.vector_store_dir, GENERATIONS_DIR)
+        path = os.path.join(generations_root, generation_id)
+        try:
+            if state.chunks:
+                fields = [chunk_metadata(chunk) for chunk in state.chunks]
+                names = sorted({name for chunk_fields in fields for name in chunk_fields})
+                columns = {name: [chunk_fields.get(name) for chunk_fields in fields] for name in names}
+                texts = [chunk.text for chunk in state.chunks]
+                # each generation gets its own directory so files a running reader has memory-mapped are never rewritten
+                store_size = write_columnar(path, state.embedding_matrix, texts, columns)
+                _publish_staged(self._stage_search_indexes(state, path))
+                self._publish_generation(generation_id)
+                self._state = state._replace(generation_id=generation_id, path=path)
+                daily_logger.info(f"Wrote {len(state.data)} documents ({len(state.chunks)} chunks) out to {path}")
+                daily_logger.info(f"VectorStore is {store_size} bytes")
+                self._prune_generations(generations_root, keep=generation_id)
+                return True
+            daily_logger.warning(f"Cannot save to {path} because VectorStore has no contents.")
+        except (OSError, TypeError) as e:
+            daily_logger.error(f"Error saving to {path}: {e}")
+        return False
+
+    def _publish_generation(self, generation_id: str) -> None:
+        """ Atomically points CURRENT at a fully written generation """
+        current_file = os.path.join(config.vector_store_dir, CURRENT_GENERATION_FILE)
+        tmp_path = f"{current_file}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(generation_id)
+        os.replace(tmp_path, current_file)
+
+    def _prune_generations(self, generations_root: str, keep: str) -> None:
+        """
+        Removes all but the newest config.store_generations_kept generations (at least this one and the previous one, for
+        results still being served from it). A process that loaded a removed generation keeps reading it through its
+        open mmaps (read_columnar maps every file up front)
+        """
+        generations = sorted(os.listdir(generations_root), key=lambda name: int(name) if name.isdigit() else -1)
+        for name in generations[:-max(2, config.store_generations_kept)]:
+            if name != keep:
+                shutil.rmtree(os.path.join(generations_root, name), ignore_errors=True)
+
+    def _load_columnar(self) -> Optional[StoreState]:
+        generation_id = self.latest_generation_id()
+        if generation_id is not None:
+            path = os.path.join(config.vector_store_dir, GENERATIONS_DIR, generation_id)
+        else:
+            # store written before generations existed
+            path = config.vector_store_dir
+        try:
+            matrix, texts, columns = read_columnar(path)
+        except FileNotFoundError as e:
+            runtime_logger.error(f"Error reading VectorStore from {path}: {e}")
+            return None
+
+        names = list(columns.keys())
+        chunks = []
+        data: Dict[str, List['Chunk']] = {}
+        for row in range(matrix.shape[0]):
+            chunk = MappedChunk(row, matrix, texts, **{name: columns[name][row] for name in names})
+            chunks.append(chunk)
+            data.setdefault(chunk.newsletter, []).append(chunk)
+        runtime_logger.info(f"Memory-mapped {len(data)} documents ({len(chunks)} chunks) from {path}")
+        return StoreState.build(data, matrix, chunks, self._state)._replace(generation_id=generation_id, path=path)
+
+    def _ann_index_path(self, path: str) -> str:
+        if config.vector_store_format == "columnar":
+            return os.path.join(path, "ann_index.npz")
+        return f"{path}.ann.npz"
+
+    def _quantized_prefix(self, path: str) -> str:
+        if config.vector_store_format == "columnar":
+            return os.path.join(path, "embeddings_quantized")
+        return f"{path}.quantized"
+
+    def _lexical_index_path(self, path: str) -> str:
+        if config.vector_store_format == "columnar":
+            return os.path.join(path, "lexical_index.npz")
+        return f"{path}.bm25.npz"
+
+    def _stage_search_indexes(self, state: StoreState, path: str) -> List[Tuple[Optional[str], str]]:
+        """
+        Writes [state]'s search structures for the store at [path] under .tmp names, without touching the live files
+
+        Returns:
+            (staged file, final path) renames for _publish_staged; a None staged file means the final file is removed
+        """
+        moves: List[Tuple[Optional[str], str]] = []
+        try:
+            def stage(final_path: str, write) -> None:
+                tmp_path = f"{final_path}.tmp"
+                write(tmp_path)
+                moves.append((tmp_path, final_path))
+
+            ann_path = self._ann_index_path(path)
+            if state.ann_index is not None:
+                stage(ann_path, state.ann_index.save)
+                daily_logger.info(f"Wrote IVF index to {ann_path}")
+            else:
+                moves.append((None, ann_path))
+            prefix = self._quantized_prefix(path)
+            files = state.quantized.files(prefix) if state.quantized is not None else dict.fromkeys(QuantizedMatrix.all_files(prefix))
+            for final_path, array in files.items():
+                if array is None:
+                    moves.append((None, final_path))
+                else:
+                    stage(final_path, lambda tmp_path, array=array: _save_npy(tmp_path, array))
+            lexical_path = self._lexical_index_path(path)
+            if state.lexical_index is not None:
+                stage(lexical_path, state.lexical_index.save)
+                daily_logger.info(f"Wrote BM25 index to {lexical_path}")
+            else:
+                moves.append((None, lexical_path))
+        except BaseException:
+            _discard_staged(moves)
+            raise
+        return moves
+
+    def _attach_search_indexes(self, state: StoreState) -> StoreState:
+        """ Loads the ANN, BM25 index and quantized codes saved with [state] (deriving the codes if missing or stale) """
+        num_chunks = len(state.chunks)
+        ann_index = None
+        ann_path = self._ann_index_path(state.path)
+        if config.ann_enabled and os.path.exists(ann_path):
+            index = IVFIndex.load(ann_path)
+            if index.num_rows == num_chunks:
+                ann_index = index
+                runtime_logger.info(f"Loaded IVF index with {index.n_lists} lists from {ann_path}")
+            else:
+                runtime_logger.warning(f"Ignoring stale ANN index at {ann_path} ({index.num_rows} rows, store has {num_chunks})")
+
+        quantized = None
+        if quantization_mode() is not None and num_chunks:
+            prefix = self._quantized_prefix(state.path)
+            if QuantizedMatrix.exists(prefix):
+                quantized = QuantizedMatrix.load(prefix)
+                if quantized.num_rows != num_chunks or quantized.mode != config.embedding_quantization:
+                    quantized = None
+            if quantized is None:
+                # missing or stale on disk -> derive from the full-precision matrix
+                quantized = QuantizedMatrix.from_float(state.embedding_matrix, config.embedding_quantization)
+                runtime_logger.info(f"Quantized {quantized.num_rows} embeddings to {quantized.mode} at load")
+
+        lexical_index = None
+        lexical_path = self._lexical_index_path(state.path)
+        if config.retrieval_mode == "hybrid" and os.path.exists(lexical_path):
+            index = BM25Index.load(lexical_path)
+            if index.num_rows == num_chunks:
+                lexical_index = index
+                runtime_logger.info(f"Loaded BM25 index with {len(index.terms)} terms from {lexical_path}")
+            else:
+                runtime_logger.warning(f"Ignoring stale BM25 index at {lexical_path} ({index.num_rows} rows, store has {num_chunks})")
+        return state._replace(ann_index=ann_index, quantized=quantized, lexical_index=lexical_index)
 
 
 class Chunk:
     """
-    For this use case, a Chunk object could be more accurately named an Article object since I set up the chunking such that newsletter data was chunked by articles to retain all relevant information and get a better holistic view for the LLM but I left it named Chunk for the sake of terminology.
+    One embedded passage of an article. Articles longer than a single model window are split into overlapping passages
+    at ingest, each stored as its own Chunk sharing the article's article_id (passage_index gives its position).
+    Stores written before passages existed hold one Chunk per article with no article_id; article_key() covers both.
+    summary is the article's ingest-time LLM summary (same on every passage), used by /chat in place of the raw text.
     """
-    def __init__(self, id: str, newsletter: str, url: str, title: str, text: str, embeddings: List[int]):
+    def __init__(self, id: str, newsletter: str, url: str, title: str, text: str, embeddings: List[int],
+                 content_hash: Optional[str] = None, ingested_at: Optional[float] = None,
+                 article_id: Optional[str] = None, passage_index: int = 0, minhash: Optional[str] = None,
+                 published_at: Optional[float] = None, source_type: Optional[str] = None, summary: Optional[str] = None):
         self.id=id
         self.newsletter=newsletter
         self.url=url
         self.title=title
         self.text=text
         self.embeddings=embeddings
-        self.similarity_score: Optional[float]=None
+        self.content_hash=content_hash
+        self.ingested_at=ingested_at
+        self.article_id=article_id
+        self.passage_index=passage_index
+        self.minhash=minhash
+        self.published_at=published_at
+        self.source_type=source_type
+        self.summary=summary
+
+
+def _save_npy(path: str, array: np.ndarray) -> None:
+    with open(path, 'wb') as f:
+        np.save(f, array)
+
+
+def _publish_staged(moves: List[Tuple[Optional[str], str]]) -> None:
+    """ Renames staged files over their final paths back to back (None: remove the final file) """
+    for tmp_path, final_path in moves:
+        if tmp_path is not None:
+            os.replace(tmp_path, final_path)
+        elif os.path.exists(final_path):
+            os.remove(final_path)
+
+
+def _discard_staged(moves: List[Tuple[Optional[str], str]]) -> None:
+    for tmp_path, _ in moves:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def quantization_mode() -> Optional[str]:
+    """
+    config.embedding_quantization, or None when it is "none" or the store is the in-memory joblib pickle: there the
+    float32 matrix is resident anyway, so the codes would only add memory
+    """
+    if config.embedding_quantization == "none" or config.vector_store_format != "columnar":
+        return None
+    return config.embedding_quantization
+
+
+def article_key(chunk: 'Chunk') -> str:
+    """ Id of the article [chunk] belongs to (the chunk's own id for single-chunk articles from older stores) """
+    return getattr(chunk, "article_id", None) or chunk.id
+
+
+def source_type(chunk: 'Chunk') -> str:
+    """ "arxiv" or "blog" (derived from the url for chunks stored before the field existed) """
+    return getattr(chunk, "source_type", None) or ("arxiv" if "arxiv.org" in chunk.url else "blog")
+
+
+def published_time(chunk: 'Chunk') -> float:
+    """ Feed publish time, falling back to ingest time for entries without one and chunks from older stores """
+    return getattr(chunk, "published_at", None) or getattr(chunk, "ingested_at", None) or 0.0
+
+
+_NO_ROWS = np.empty(0, dtype=np.int64)
+
+
+def _partition(keys) -> Dict[Any, np.ndarray]:
+    """ Groups row numbers by key; rows come out ascending since they are visited in order """
+    partitions: Dict[Any, List[int]] = {}
+    for row, key in enumerate(keys):
+        partitions.setdefault(key, []).append(row)
+    return {key: np.asarray(rows, dtype=np.int64) for key, rows in partitions.items()}
+
+
+def chunk_metadata(chunk: 'Chunk') -> Dict[str, Any]:
+    """ Scalar Chunk fields stored as metadata columns (everything but the text and embedding payloads) """
+    return {name: value for name, value in vars(chunk).items()
+            if not name.startswith("_") and name not in ("text", "embeddings")}
+
+
+class MappedChunk(Chunk):
+    """
+    Chunk opened from the columnar store format. The embedding is a row view into the memory-mapped matrix and the text is
+    only read from the sidecar when accessed, so loading the store costs just its small metadata.
+    """
+    def __init__(self, row: int, matrix: np.ndarray, texts: TextColumn, **fields: Any):
+        self.__dict__.update(fields)
+        self._row = row
+        self._matrix = matrix
+        self._texts = texts
+
+    @property
+    def text(self) -> str:
+        return self._texts.get(self._row)
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        return self._matrix[self._row]
+
+
+class SearchFilter(NamedTuple):
+    """ Optional retrieval restrictions; unset fields don't filter. since/until are unix times (inclusive). """
+    newsletters: Optional[Tuple[str, ...]] = None
+    since: Optional[float] = None
+    until: Optional[float] = None
+    source_type: Optional[str] = None
+
+    def is_empty(self) -> bool:
+        return not self.newsletters and self.since is None and self.until is None and not self.source_type
+
 
-    def set_similarity_score(self, score: float) -> None:
-        self.similarity_score=score
+class SearchHit(NamedTuple):
+    """ Immutable per-query retrieval result so scores are never written back onto shared Chunk objects """
+    chunk: Chunk
+    score: float
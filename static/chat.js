@@ -15,25 +15,13 @@ document.addEventListener("DOMContentLoaded", () => {
         setLoading(true);
 
         try {
-            // get related articles
-            const articleResponse = await fetch("/related_articles", {
-                method: "POST",
-                headers: { "Content-Type": "application/json" },
-                body: JSON.stringify({ message: query }),
-            });
-            const article_data = await articleResponse.json();
-            updateSidebar(article_data.related_text);
-
-            // start streaming chat response
-            const chatResponse = await fetch("/chat", {
+            // single call: first line is the sidebar JSON, the rest is the streamed LLM response
+            const chatResponse = await fetch("/ask", {
                 method: "POST",
                 headers: { 
                     "Content-Type": "application/json"
                 },
-                body: JSON.stringify({
-                    message: query,
-                    articles_list: article_data.articles_list
-                }),
+                body: JSON.stringify({ message: query }),
             });
 
             if (!chatResponse.ok) {
@@ -44,6 +32,8 @@ document.addEventListener("DOMContentLoaded", () => {
             addMessage("bot", "");
             const lastBotMessage = chatWindow.querySelector(".message.bot:last-child .message-content");
             let accumulatedText = "";
+            let headerBuffer = "";
+            let sidebarReceived = false;
 
             // read the plain text stream directly from llm
             const reader = chatResponse.body.getReader();
@@ -53,7 +43,15 @@ document.addEventListener("DOMContentLoaded", () => {
                 const { value, done } = await reader.read();
                 if (done) break;
 
-                const chunk = decoder.decode(value, { stream: true });
+                let chunk = decoder.decode(value, { stream: true });
+                if (!sidebarReceived) {
+                    headerBuffer += chunk;
+                    const newline = headerBuffer.indexOf("\n");
+                    if (newline === -1) continue;
+                    updateSidebar(JSON.parse(headerBuffer.slice(0, newline)).related_text);
+                    sidebarReceived = true;
+                    chunk = headerBuffer.slice(newline + 1);
+                }
                 accumulatedText += chunk;
                 
                 // apply markdown formatting
@@ -0,0 +1,19 @@
+import os
+import sys
+import pytest
+
+# Config reads settings/config.json relative to the working directory, same as the app (WORKDIR /app)
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+os.chdir(REPO_ROOT)
+
+@pytest.fixture(scope="session")
+def embedding_model():
+    """ Loads the configured tokenizer/model once; tests that need it are skipped where it can't be downloaded """
+    from settings import ModelResources
+    resources = ModelResources.get_instance()
+    try:
+        resources.warm()
+    except Exception as e:
+        pytest.skip(f"embedding model unavailable: {e}")
+    return resources
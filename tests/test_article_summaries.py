@@ -0,0 +1,63 @@
+import asyncio
+from typing import Any, Dict, List
+import numpy as np
+import pytest
+from benchmarks.fake_ollama import FakeOllamaServer
+from settings import Chunk, SearchHit, VectorStore
+from document_fetch import newsletter_data_fetch as ingest
+from utils import data_io
+from utils.passage_chunking import join_passages
+
+FAIL_MARKER = "FAIL-THIS-SUMMARY"
+
+def make_article(article_id: str, content: str) -> Dict[str, Any]:
+    return {"article_id": article_id, "title": f"Title {article_id}", "url": f"https://example.com/{article_id}",
+            "content": content, "newsletter": "Fake Weekly"}
+
+def make_passages(article: Dict[str, Any], count: int, rng: np.random.Generator) -> List[Chunk]:
+    return [Chunk(id=f"{article['article_id']}-{index}", newsletter=article["newsletter"], url=article["url"],
+                  title=article["title"], text=f"{article['title']} passage {index}: {article['content']}",
+                  embeddings=rng.standard_normal(8).astype(np.float32).tolist(), article_id=article["article_id"],
+                  passage_index=index)
+            for index in range(count)]
+
+@pytest.fixture
+def store():
+    vector_store = VectorStore.get_instance()
+    vector_store.clear()
+    yield vector_store
+    vector_store.clear()
+
+def test_attach_summaries_against_fake_ollama(store, monkeypatch):
+    rng = np.random.default_rng(0)
+    articles = [make_article(f"a{index}", f"story number {index} about GPUs") for index in range(6)]
+    articles.append(make_article("broken", f"{FAIL_MARKER} this article never gets a summary"))
+    passages = {article["article_id"]: make_passages(article, 3, rng) for article in articles}
+    for article_id, chunks in passages.items():
+        store.add_chunks(article_id, chunks)
+
+    monkeypatch.setattr(ingest.config, "summary_concurrency", 2)
+    monkeypatch.setattr(ingest.config, "summary_model", None)
+    monkeypatch.setattr(ingest.config, "use_summaries_in_chat", True)
+
+    async def run() -> FakeOllamaServer:
+        async with FakeOllamaServer(latency_ms=30, fail_marker=FAIL_MARKER) as server:
+            monkeypatch.setattr(ingest.config, "summary_endpoint", server.url)
+            assert await ingest.attach_summaries({"Fake Weekly": articles}) == len(articles) - 1
+        return server
+
+    server = asyncio.run(run())
+    assert server.requests_served == len(articles) - 1 and server.requests_failed == 1
+    assert 1 < server.max_in_flight <= ingest.config.summary_concurrency
+
+    # every passage of an article carries that article's summary
+    for article in articles[:-1]:
+        summaries = {getattr(chunk, "summary", None) for chunk in store.article_passages(passages[article["article_id"]][0])}
+        assert len(summaries) == 1 and f"story number {article['article_id'][1:]}" in summaries.pop()
+
+    # the failed article has none, so /chat is given its raw passages instead
+    broken = passages["broken"]
+    assert all(getattr(chunk, "summary", None) is None for chunk in broken)
+    formatted, _ = data_io.format_chunks([SearchHit(chunk=broken[1], score=0.9), SearchHit(chunk=passages["a0"][0], score=0.8)])
+    assert formatted[0]["Content"] == join_passages([chunk.text for chunk in broken])
+    assert formatted[1]["Content"] == passages["a0"][0].summary
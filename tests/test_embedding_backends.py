@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+import torch
+from utils import embedding_handler
+from utils.embedding_backends import OnnxBackend, TorchBackend
+
+pytest.importorskip("onnxruntime")
+
+TEXTS = [
+    "open-weight model release",
+    "Researchers released a new open-weight language model that matches larger systems on reasoning benchmarks.",
+    ("The accompanying paper describes the data mixture, the training schedule and an evaluation on long-context "
+     "retrieval tasks, where the model outperforms prior work of the same size. ") * 6,
+]
+
+def test_onnx_int8_matches_torch(embedding_model, tmp_path, monkeypatch):
+    """ The quantized ONNX graph must give (nearly) the torch vectors, since both end up in the same store """
+    monkeypatch.setattr(embedding_handler.config, "pooling", "mean")
+    onnx_backend = OnnxBackend(str(tmp_path / "model.onnx"), quantize_int8=True)
+    reference = np.stack(embedding_handler.embed_sorted_batches(TEXTS, TorchBackend(torch.device("cpu")), batch_size=2))
+    embeddings = np.stack(embedding_handler.embed_sorted_batches(TEXTS, onnx_backend, batch_size=2))
+
+    cosines = np.sum(embeddings * reference, axis=1)
+    assert cosines.min() >= 0.99, cosines
+    # nothing but the finished graph is left next to it
+    assert [path.name for path in tmp_path.iterdir()] == ["model.onnx"]
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+import torch
+from utils import embedding_handler
+from utils.embedding_backends import get_backend
+
+SHORT = "open-weight model release"
+LONG = ("Researchers released a new open-weight language model that matches larger systems on reasoning benchmarks "
+        "while running on a single GPU. The accompanying paper describes the data mixture and training schedule. ") * 8
+
+@pytest.fixture(params=["mean", "cls"])
+def pooling(request, monkeypatch, embedding_model):
+    monkeypatch.setattr(embedding_handler.config, "pooling", request.param)
+    monkeypatch.setattr(embedding_handler.config, "embedding_backend", "torch")
+    # compare like with like: the single-text path would otherwise run on the GPU when one is present
+    monkeypatch.setattr(embedding_handler, "embedding_device", lambda: torch.device("cpu"))
+    return request.param
+
+def test_query_batch_matches_single_text(pooling):
+    """ A short query padded up to much longer neighbours gets the vector it gets on its own """
+    alone = embedding_handler.prepare_embeddings(SHORT)
+    batched = embedding_handler.prepare_embeddings_batch([LONG, SHORT, LONG[:200]])
+    assert np.allclose(batched[1], alone, atol=1e-5)
+
+def test_sorted_ingest_batches_match_single_text(pooling):
+    """ Same for the length-bucketed ingest path, with a batch size that mixes the short text into a padded batch """
+    alone = embedding_handler.prepare_embeddings(SHORT)
+    texts = [LONG, SHORT, LONG[:300], LONG[:600]]
+    batched = embedding_handler.embed_sorted_batches(texts, get_backend(torch.device("cpu"), "torch"), batch_size=4)
+    assert np.allclose(batched[1], alone, atol=1e-5)
+    assert np.allclose(batched[0], embedding_handler.prepare_embeddings(LONG), atol=1e-5)
@@ -0,0 +1,32 @@
+import asyncio
+from typing import List, Tuple
+from benchmarks.fake_ollama import FakeOllamaServer
+from utils import ollama_client
+
+def test_concurrent_streams_interleave(monkeypatch):
+    """ Two /chat streams on the shared client make progress together instead of the second waiting for the first """
+    async def run() -> List[Tuple[str, str]]:
+        arrivals: List[Tuple[str, str]] = []
+
+        async def consume(label: str, query: str) -> None:
+            async for token in ollama_client.generate_response_stream(query):
+                if token.strip():
+                    arrivals.append((label, token.strip()))
+
+        async with FakeOllamaServer(latency_ms=50, token_latency_ms=20) as server:
+            monkeypatch.setitem(ollama_client.config.llm, "Endpoint", server.url)
+            monkeypatch.setattr(ollama_client, "_client", None)
+            try:
+                await asyncio.gather(consume("a", " ".join(["alpha"] * 8)), consume("b", " ".join(["beta"] * 8)))
+            finally:
+                await ollama_client.close_client()
+            assert server.max_in_flight == 2
+        return arrivals
+
+    arrivals = asyncio.run(run())
+    labels = [label for label, _ in arrivals]
+    assert labels.count("a") == 8 and labels.count("b") == 8
+    assert not any(token.startswith("[Connection Error") for _, token in arrivals)
+    # serialized streams would switch from one to the other exactly once
+    switches = sum(1 for previous, current in zip(labels, labels[1:]) if previous != current)
+    assert switches >= 4, labels
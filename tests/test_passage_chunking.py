@@ -0,0 +1,15 @@
+from utils import passage_chunking
+from utils.passage_chunking import join_passages, passage_header, split_passages
+
+CONTENT = " ".join(f"Sentence {i} of the article mentions model-{i % 7} and benchmark {i * 3}." for i in range(200))
+
+def test_join_passages_rebuilds_article(embedding_model, monkeypatch):
+    """ /chat gets the whole article back from its overlapping passages, with one header and no repeated text """
+    monkeypatch.setattr(passage_chunking.config, "max_passages_per_article", 1000)
+    passages, capped = split_passages("A title", "https://example.com/a", CONTENT)
+    assert len(passages) > 2 and not capped
+    assert join_passages(passages) == passage_header("A title", "https://example.com/a") + CONTENT
+
+def test_join_passages_without_overlap_keeps_both_parts():
+    header = passage_header("A title", "https://example.com/a")
+    assert join_passages([header + "first part.", header + "second part."]) == header + "first part. second part."
@@ -0,0 +1,16 @@
+from utils.query_cache import QueryCache
+
+def test_normalize_ignores_case_whitespace_and_trailing_punctuation():
+    assert QueryCache.normalize("  What is  new in LLMs?? ") == QueryCache.normalize("what is new in llms")
+    assert QueryCache.normalize("Latest GPU news!") == QueryCache.normalize("latest gpu news.")
+
+def test_normalize_keeps_symbols_that_change_meaning():
+    assert QueryCache.normalize("What is C++") != QueryCache.normalize("what is c")
+    assert QueryCache.normalize("news about C#") != QueryCache.normalize("news about c")
+    assert QueryCache.normalize(".NET 9 release") != QueryCache.normalize("NET 9 release")
+
+def test_distinct_queries_get_distinct_entries():
+    cache = QueryCache(max_entries=8, ttl_seconds=60)
+    cache.put("What is C++", generation=0, value="c++ hits")
+    assert cache.get("what is c", generation=0) is None
+    assert cache.get("what is c++?", generation=0) == "c++ hits"
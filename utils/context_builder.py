@@ -0,0 +1,118 @@
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional
+from settings import Config, Logger
+from settings.lexical_index import tokenize
+
+config = Config.get_instance()
+runtime_logger = Logger.get_runtime_logger("chatbot")
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(\[])")
+# fallback when no LLM tokenizer is configured/available; deliberately low so estimates err toward overcounting
+CHARS_PER_TOKEN_ESTIMATE = 3.2
+
+_tokenizer: Any = None
+_tokenizer_lock = threading.Lock()
+_tokenizer_failed = False
+
+def _get_tokenizer() -> Any:
+    """ HuggingFace tokenizer matching the Ollama model (config.llm["Tokenizer"]), loaded on first use """
+    global _tokenizer, _tokenizer_failed
+    name = config.llm.get("Tokenizer")
+    if _tokenizer is None and name and not _tokenizer_failed:
+        with _tokenizer_lock:
+            if _tokenizer is None and not _tokenizer_failed:
+                try:
+                    from transformers import AutoTokenizer
+                    _tokenizer = AutoTokenizer.from_pretrained(name)
+                except Exception as e:
+                    _tokenizer_failed = True
+                    runtime_logger.warning(f"Could not load LLM tokenizer {name}, estimating tokens from length: {e}")
+    return _tokenizer
+
+def count_tokens(text: str) -> int:
+    tokenizer = _get_tokenizer()
+    if tokenizer is None:
+        return int(len(text) / CHARS_PER_TOKEN_ESTIMATE) + 1
+    return len(tokenizer.encode(text, add_special_tokens=False))
+
+def format_article(article: Dict[str, Any], content: str) -> str:
+    return f"[Article Title:]{article['Title']}\n[Newsletter where article is from:]{article['Newsletter_From']}\n[Article Content:]{content}"
+
+def context_token_budget(query: str) -> int:
+    """ Tokens left for article text after the Modelfile system prompt, the prompt scaffolding, the query and the answer """
+    llm = config.llm
+    return llm["Num_Ctx"] - llm["Max_Response_Tokens"] - llm["Prompt_Overhead_Tokens"] - count_tokens(query)
+
+def extract_relevant_sentences(query: str, content: str, budget: int) -> str:
+    """
+    Keeps the sentences of [content] that best match [query] until [budget] tokens are used, then restores their original
+    order. A query term counts 1 / (number of sentences containing it), so a rare name outweighs a word found everywhere;
+    ties go to earlier sentences since articles front-load their key facts. Gaps are marked with "...".
+    """
+    sentences = [sentence for sentence in _SENTENCE_END.split(content) if sentence.strip()]
+    query_terms = set(tokenize(query))
+    sentence_terms = [query_terms.intersection(tokenize(sentence)) for sentence in sentences]
+    sentence_counts = Counter(term for terms in sentence_terms for term in terms)
+    relevance = [sum(1 / sentence_counts[term] for term in terms) for terms in sentence_terms]
+    ranked = sorted(range(len(sentences)), key=lambda i: (-relevance[i], i))
+
+    chosen = []
+    used = 0
+    for i in ranked:
+        cost = count_tokens(sentences[i])
+        if used + cost > budget:
+            continue
+        chosen.append(i)
+        used += cost
+    if not chosen:
+        # a single sentence longer than the whole budget
+        return content[:int(budget * CHARS_PER_TOKEN_ESTIMATE)]
+
+    chosen.sort()
+    parts = [sentences[chosen[0]]]
+    for previous, current in zip(chosen, chosen[1:]):
+        parts.append(("... " if current != previous + 1 else "") + sentences[current])
+    return " ".join(parts)
+
+def build_article_context(query: str, articles: List[Dict[str, Any]]) -> List[str]:
+    """
+    Fits the retrieved articles into the model's context window (config.llm["Num_Ctx"]).
+    The budget is shared evenly, and what short articles leave unused is passed on to the longer ones. Articles that fit are
+    included verbatim, so the same article yields the same prompt text for any question (reusable KV-cache prefix); only
+    articles over their share are cut down to their most query-relevant sentences.
+    Articles are ordered by title rather than by score so a follow-up that retrieves the same set produces the same prefix.
+    """
+    if not articles:
+        return []
+    articles = sorted(articles, key=lambda article: (article["Title"], article["Newsletter_From"]))
+    remaining = max(0, context_token_budget(query))
+    sizes = [count_tokens(article["Content"]) for article in articles]
+
+    # hand out the budget smallest-first so leftover from short articles flows to the long ones
+    allowances: List[Optional[int]] = [None] * len(articles)
+    for position, i in enumerate(sorted(range(len(articles)), key=lambda i: sizes[i])):
+        share = remaining // (len(articles) - position)
+        allowances[i] = min(sizes[i], share)
+        remaining -= allowances[i]
+
+    formatted = []
+    for article, size, allowance in zip(articles, sizes, allowances):
+        content = article["Content"]
+        if size > allowance:
+            content = extract_relevant_sentences(query, content, allowance)
+            runtime_logger.info(f"Trimmed {article['Title']} from {size} to ~{allowance} tokens for the context window")
+        formatted.append(format_article(article, content))
+    return formatted
+
+def create_prompt_with_articles(query: str, articles: List[str]) -> str:
+    """ Stable instructions and article text first and the question last, so consecutive prompts share the longest prefix """
+    articles_text = "\n\n".join(articles)
+    return f"""Here are relevant newsletter articles:
+
+{articles_text}
+
+The user asks: "{query}"
+
+Please analyze accordingly."""
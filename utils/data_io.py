@@ -1,8 +1,10 @@
 import json
 from typing import Any, Dict, List, Tuple
-from settings import Config, Logger, Chunk
+from settings import Config, Logger, SearchHit, VectorStore
+from utils.passage_chunking import join_passages
 
 config = Config.get_instance()
+vector_store = VectorStore.get_instance()
 runtime_logger = Logger.get_runtime_logger("chatbot")
 
 def read_json(path: str) -> Any:
@@ -16,27 +18,30 @@ def read_json(path: str) -> Any:
 
 
 def format_chunks(
-        chunk_objs: List['Chunk']
+        hits: List['SearchHit']
         ) -> Tuple[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]:
     """
-    Format content for LLM summarization and JSON ouput to interface
+    Format content for LLM summarization and JSON ouput to interface. Hits are single passages, so the LLM gets the whole
+    article rebuilt from all of its passages (build_article_context trims it to the context window)
 
     Args:
-        chunk_objs: List of <= top_k chunks/articles similar to user query
+        hits: List of <= top_k (chunk, score) hits similar to user query
     
     Returns:
         (List of articles formatted, JSON-formatted summary content for sidebar)
     """
     articles_text = []
     json_formatted = {}
-    for chunk in chunk_objs:
+    for chunk, score in hits:
         if chunk.text and chunk.text.strip():
+            # the ingest-time summary (when there is one) is far shorter than the article, which shortens time-to-first-token
+            summary = getattr(chunk, "summary", None) if config.use_summaries_in_chat else None
             articles_text.append({
                 "Title": chunk.title,
                 "Newsletter_From": chunk.newsletter,
-                "Content": chunk.text
+                "Content": summary or join_passages([passage.text for passage in vector_store.article_passages(chunk)])
             })
-            score = float(chunk.similarity_score)
+            score = float(score)
             if chunk.newsletter in json_formatted:
                 json_formatted[chunk.newsletter].append({
                     "article_title": chunk.title,
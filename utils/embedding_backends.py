@@ -0,0 +1,146 @@
+import inspect
+import os
+import threading
+import uuid
+import numpy as np
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+from settings import Config, Logger, ModelResources
+
+if TYPE_CHECKING:
+    import torch
+
+config = Config.get_instance()
+resources = ModelResources.get_instance()
+daily_logger = Logger.get_daily_logger("data_fetch")
+
+class EmbeddingBackend:
+    """
+    Runs the encoder over tokenized inputs and returns its last_hidden_state; pooling/normalizing stays in embedding_handler
+    so every backend produces vectors the same way.
+    """
+    name = "base"
+
+    def hidden_states(self, inputs: Dict[str, 'torch.Tensor']) -> 'torch.Tensor':
+        raise NotImplementedError
+
+    def prepare(self) -> None:
+        """ Does any one-time setup (e.g. exporting a model file) up front, before work is spread over processes """
+
+class TorchBackend(EmbeddingBackend):
+    """ Eager PyTorch AutoModel (the original path); the only backend used on GPU """
+    name = "torch"
+
+    def __init__(self, target_device: 'torch.device'):
+        self.device = target_device
+
+    def hidden_states(self, inputs: Dict[str, 'torch.Tensor']) -> 'torch.Tensor':
+        import torch
+        model = resources.model
+        if self.device.type != "cpu":
+            model = model.to(self.device)
+        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        with torch.no_grad():
+            return model(**inputs).last_hidden_state
+
+class OnnxBackend(EmbeddingBackend):
+    """
+    ONNX Runtime CPU inference on an exported (optionally int8 dynamically quantized) graph of the embedding model.
+    The graph is exported from the torch model the first time it is needed and cached at config.onnx_model_path.
+    """
+    name = "onnx"
+
+    def __init__(self, model_path: str, quantize_int8: bool):
+        self.model_path = model_path
+        self.quantize_int8 = quantize_int8
+        self._session = None
+        self._input_names: List[str] = []
+        self._lock = threading.Lock()
+
+    def _get_session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import onnxruntime as ort
+                    import torch
+                    if not os.path.exists(self.model_path):
+                        export_onnx(self.model_path, self.quantize_int8)
+                    options = ort.SessionOptions()
+                    # follows torch's thread count, which prepare_embeddings_cpu sets per process
+                    options.intra_op_num_threads = torch.get_num_threads()
+                    session = ort.InferenceSession(self.model_path, options, providers=["CPUExecutionProvider"])
+                    self._input_names = [graph_input.name for graph_input in session.get_inputs()]
+                    self._session = session
+        return self._session
+
+    def prepare(self) -> None:
+        self._get_session()
+
+    def hidden_states(self, inputs: Dict[str, 'torch.Tensor']) -> 'torch.Tensor':
+        import torch
+        session = self._get_session()
+        feed = {}
+        for name in self._input_names:
+            if name in inputs:
+                feed[name] = inputs[name].cpu().numpy().astype(np.int64)
+            else:
+                # e.g. token_type_ids for single-segment text
+                feed[name] = np.zeros_like(inputs["input_ids"].cpu().numpy(), dtype=np.int64)
+        last_hidden_state = session.run(["last_hidden_state"], feed)[0]
+        return torch.from_numpy(last_hidden_state)
+
+def export_onnx(model_path: str, quantize_int8: bool) -> None:
+    """
+    Exports the embedding model with dynamic batch/sequence axes, then optionally int8-quantizes its weights.
+    Both steps write to names unique to this call and the result is moved into place with os.replace, so processes
+    exporting at the same time (embedding shards, uvicorn workers) never read a half-written graph or delete each other's files.
+    """
+    import torch
+    os.makedirs(os.path.dirname(model_path) or ".", exist_ok=True)
+    sample = resources.tokenizer(["export sample text"], return_tensors="pt")
+    # graph inputs follow forward()'s parameter order (input_ids, attention_mask, token_type_ids for BERT), not the tokenizer's
+    input_names = [name for name in inspect.signature(resources.model.forward).parameters if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names + ["last_hidden_state"]}
+    tmp_path = f"{model_path}.{os.getpid()}-{uuid.uuid4().hex}.tmp"
+    fp32_path = f"{tmp_path}.fp32.onnx" if quantize_int8 else tmp_path
+
+    try:
+        with torch.no_grad():
+            torch.onnx.export(
+                resources.model,
+                (dict(sample),),
+                fp32_path,
+                input_names=input_names,
+                output_names=["last_hidden_state"],
+                dynamic_axes=dynamic_axes,
+                opset_version=17,
+                dynamo=False
+            )
+        if quantize_int8:
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+            quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+        os.replace(tmp_path, model_path)
+    finally:
+        for path in (fp32_path, tmp_path):
+            if os.path.exists(path):
+                os.remove(path)
+    daily_logger.info(f"Exported {config.embedding_model} to ONNX at {model_path} (int8={quantize_int8})")
+
+_backends: Dict[Tuple[str, str], EmbeddingBackend] = {}
+
+def get_backend(target_device: 'torch.device', name: Optional[str] = None) -> EmbeddingBackend:
+    """
+    Backend for [target_device] as selected by config.embedding_backend ("torch" or "onnx"). ONNX is CPU-only, so GPU work
+    always uses torch.
+    """
+    name = name or config.embedding_backend
+    if target_device.type != "cpu":
+        name = "torch"
+    key = (name, str(target_device))
+    if key not in _backends:
+        if name == "onnx":
+            _backends[key] = OnnxBackend(config.onnx_model_path, config.onnx_quantize_int8)
+        elif name == "torch":
+            _backends[key] = TorchBackend(target_device)
+        else:
+            raise ValueError(f"Unknown embedding backend: {name}")
+    return _backends[key]
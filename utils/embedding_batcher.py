@@ -0,0 +1,71 @@
+import queue
+import threading
+import time
+import numpy as np
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+from settings import Logger
+
+runtime_logger = Logger.get_runtime_logger("chatbot")
+
+class EmbeddingBatcher:
+    """
+    In-process micro-batcher for query embeddings.
+    Request threads submit a single text and block on a Future while one background worker gathers every query that
+    arrives within [max_wait_ms] (up to [max_batch_size]) into one padded model call and hands each caller its own vector.
+    """
+    def __init__(self,
+                 embed_batch: Callable[[List[str]], List[np.ndarray]],
+                 max_batch_size: int = 32,
+                 max_wait_ms: float = 5.0):
+        self.embed_batch = embed_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._worker.start()
+
+    def submit(self, text: str) -> Future:
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def embed(self, text: str) -> np.ndarray:
+        """ Blocking helper for sync handlers: queue [text] and wait for its vector """
+        return self.submit(text).result()
+
+    def _collect_batch(self) -> List[Tuple[str, Future]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect_batch()
+            texts = [text for text, _ in batch]
+            try:
+                embeddings = self.embed_batch(texts)
+                for (_, future), embedding in zip(batch, embeddings):
+                    future.set_result(embedding)
+            except Exception as e:
+                runtime_logger.error(f"Batched query embedding failed for {len(batch)} queries: {str(e)}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
@@ -1,19 +1,42 @@
-import torch
+import os
+import math
+import multiprocessing
+import functools
 import numpy as np
-from typing import List
-from settings import Config, Logger
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, TYPE_CHECKING
+from settings import Config, Logger, ModelResources
+from utils.embedding_backends import EmbeddingBackend, get_backend
 
+if TYPE_CHECKING:
+    import torch
+
+# torch is imported on the first embedding call (like the model in ModelResources), so importing this module stays cheap
 config = Config.get_instance()
+resources = ModelResources.get_instance()
 daily_logger = Logger.get_daily_logger("data_fetch")
 
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-has_gpu = torch.cuda.is_available()
+@functools.lru_cache(maxsize=None)
+def embedding_device() -> 'torch.device':
+    import torch
+    return torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+def has_gpu() -> bool:
+    return embedding_device().type == "cuda"
+
+def embed_inputs(inputs) -> np.ndarray:
+    """
+    Forward pass of already-tokenized [inputs] through the configured backend (config.embedding_backend), then pooling
+    """
+    hidden = get_backend(embedding_device()).hidden_states(inputs)
+    embeddings = pool_embeddings(hidden, inputs["attention_mask"].to(hidden.device))
+    return embeddings.cpu().numpy()
 
 def prepare_embeddings(text: str) -> np.ndarray:
     """
     Compute embeddings for a single text.
     """
-    inputs = config.tokenizer(
+    inputs = resources.tokenizer(
         text,
         padding=True,
         truncation=True,
@@ -21,53 +44,126 @@ def prepare_embeddings(text: str) -> np.ndarray:
         return_tensors="pt"
     )
 
-    if has_gpu:
-        inputs = {k: v.to(device) for k, v in inputs.items()}
-        model = config.embedding_model.to(device)
+    embeddings = embed_inputs(inputs)[0]
+
+    return embeddings
+
+def mean_pool(last_hidden_state: 'torch.Tensor', attention_mask: 'torch.Tensor') -> 'torch.Tensor':
+    """
+    Mean of token vectors over real (non-padding) positions only, so a text's vector does not depend on what else is in its batch
+    """
+    mask = attention_mask.unsqueeze(-1).to(last_hidden_state.dtype)
+    summed = (last_hidden_state * mask).sum(dim=1)
+    counts = mask.sum(dim=1).clamp(min=1e-9)
+    return summed / counts
+
+def pool_embeddings(last_hidden_state: 'torch.Tensor', attention_mask: 'torch.Tensor') -> 'torch.Tensor':
+    """
+    Single pooling step shared by every embedding path (query, batched query, CPU and GPU ingest) so a text gets the same
+    vector no matter how it was batched. config.pooling is "mean" (masked mean) or "cls" (the [CLS] vector bge models are
+    trained for). Changing it requires a full (non-incremental) rebuild of the store.
+    """
+    import torch
+    if config.pooling == "cls":
+        pooled = last_hidden_state[:, 0]
     else:
-        model = config.embedding_model
+        pooled = mean_pool(last_hidden_state, attention_mask)
+    return torch.nn.functional.normalize(pooled, p=2, dim=1)
 
-    with torch.no_grad():
-        outputs = model(**inputs)
-        embeddings = outputs.last_hidden_state.mean(dim=1).squeeze()
-        embeddings = torch.nn.functional.normalize(embeddings.unsqueeze(0), p=2, dim=1).squeeze()
-        embeddings = embeddings.cpu().numpy()
+def prepare_embeddings_batch(texts: List[str]) -> List[np.ndarray]:
+    """
+    Compute embeddings for a small list of texts in a single padded forward pass (used for batching user queries)
+    """
+    if not texts:
+        return []
 
-    return embeddings
+    inputs = resources.tokenizer(
+        texts,
+        padding=True,
+        truncation=True,
+        max_length=512,
+        return_tensors="pt"
+    )
 
-def prepare_embeddings_gpu(texts: List[str]) -> List[np.ndarray]:
+    embeddings = embed_inputs(inputs)
+
+    return list(embeddings)
+
+def embed_sorted_batches(texts: List[str], backend: EmbeddingBackend, batch_size: int) -> List[np.ndarray]:
     """
-    Compute embeddings for a list of texts via GPU
+    Tokenizes every text once, then runs batches of similar token length so each batch is only padded to its own longest text.
+    Results are returned in the original order of [texts].
+    """
+    encoded = resources.tokenizer(texts, truncation=True, max_length=512)
+    order = sorted(range(len(texts)), key=lambda i: len(encoded["input_ids"][i]))
+    results: List[np.ndarray] = [None] * len(texts)
+
+    for start in range(0, len(order), batch_size):
+        batch_idx = order[start:start + batch_size]
+        inputs = resources.tokenizer.pad(
+            {key: [encoded[key][i] for i in batch_idx] for key in encoded.keys()},
+            padding=True,
+            return_tensors="pt"
+        )
+        hidden = backend.hidden_states(inputs)
+        embeddings = pool_embeddings(hidden, inputs["attention_mask"].to(hidden.device)).cpu().numpy()
+
+        for i, embedding in zip(batch_idx, embeddings):
+            results[i] = embedding
+    return results
+
+def _init_embedding_worker(num_threads: int) -> None:
+    import torch
+    torch.set_num_threads(num_threads)
+
+def _embed_shard(texts: List[str]) -> List[np.ndarray]:
+    import torch
+    return embed_sorted_batches(texts, get_backend(torch.device("cpu")), config.cpu_batch_size)
+
+def prepare_embeddings_cpu(texts: List[str]) -> List[np.ndarray]:
+    """
+    Compute embeddings for a list of texts on CPU in length-bucketed batches of config.cpu_batch_size, through the configured
+    backend (torch or ONNX Runtime). Intra-op threads are capped at config.embedding_threads (default: all cores). With
+    config.embedding_processes > 1 the texts are sharded across that many spawned processes, each getting an equal share of the cores.
     """
     if not texts:
         return []
 
-    if has_gpu:
-        model = config.embedding_model.to(device)
-        tokenizer = config.tokenizer
-        all_embeddings = []
+    import torch
+    total_threads = config.embedding_threads or os.cpu_count() or 1
+    processes = max(1, min(config.embedding_processes, len(texts)))
 
-        for i in range(0, len(texts), config.batch_size):
-            batch_texts = texts[i:i+config.batch_size]
+    if processes == 1:
+        torch.set_num_threads(total_threads)
+        return _embed_shard(texts)
 
-            inputs = tokenizer(
-                batch_texts,
-                padding=True,
-                truncation=True,
-                max_length=512,
-                return_tensors="pt"
-            )
+    # export/load the ONNX graph here once, so the spawned shards only ever open a finished file
+    get_backend(torch.device("cpu")).prepare()
+    shard_size = math.ceil(len(texts) / processes)
+    shards = [texts[i:i + shard_size] for i in range(0, len(texts), shard_size)]
+    threads_per_process = max(1, total_threads // len(shards))
+    daily_logger.info(f"Sharding CPU embedding across {len(shards)} processes x {threads_per_process} threads")
 
-            inputs = {k: v.to(device) for k, v in inputs.items()}
+    # spawn (not fork) so children don't inherit torch's already-started OpenMP thread pool
+    with ProcessPoolExecutor(max_workers=len(shards),
+                             mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_embedding_worker,
+                             initargs=(threads_per_process,)) as pool:
+        results = []
+        for shard_embeddings in pool.map(_embed_shard, shards):
+            results.extend(shard_embeddings)
+    return results
 
-            with torch.no_grad():
-                outputs = model(**inputs)
-                embeddings = outputs.last_hidden_state.mean(dim=1)
-                embeddings = torch.nn.functional.normalize(embeddings, p=2, dim=1)
-                all_embeddings.extend(embeddings.cpu().numpy())
+def prepare_embeddings_gpu(texts: List[str]) -> List[np.ndarray]:
+    """
+    Compute embeddings for a list of texts via GPU in length-sorted batches of config.batch_size
+    """
+    if not texts:
+        return []
 
-        return all_embeddings
+    if has_gpu():
+        return embed_sorted_batches(texts, get_backend(embedding_device()), config.batch_size)
 
     else:
-        daily_logger.info("GPU not available, using CPU sequential processing")
-        return [prepare_embeddings(text) for text in texts]
+        daily_logger.info("GPU not available, using CPU batched processing")
+        return prepare_embeddings_cpu(texts)
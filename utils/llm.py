@@ -1,12 +1,19 @@
 """   OLD CODE FROM USING OPENAPI FOR SUMMARIZATIONS   """
 
-from openai import OpenAI
 from typing import Optional
 from settings import Config, Logger
 
 config = Config.get_instance()
 runtime_logger = Logger.get_runtime_logger("chatbot")
-client = OpenAI(api_key=config.llm["API_KEY"]) # Old version -> Update config.json
+_client = None
+
+def get_client():
+    """ Built on first use so importing this module doesn't import openai or need an API key """
+    global _client
+    if _client is None:
+        from openai import OpenAI
+        _client = OpenAI(api_key=config.llm["API_KEY"]) # Old version -> Update config.json
+    return _client
 
 def generate_llm_response(query, text_related: list) -> Optional[str]:
     """
@@ -35,7 +42,7 @@ def generate_llm_response(query, text_related: list) -> Optional[str]:
     
     try:
         # call to OpenAPI
-        response = client.chat.completions.create(
+        response = get_client().chat.completions.create(
             model=config.llm["MODEL"],  # Old version -> Update config.json
             messages=[
                 {
@@ -0,0 +1,127 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Sequence
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LLM_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 7.5, 10.0, 15.0, 20.0, 30.0, 60.0, 120.0)
+TOKEN_RATE_BUCKETS = (1, 2, 5, 10, 15, 20, 30, 40, 50, 75, 100, 150, 200, 300)
+
+class Histogram:
+    """ Cumulative-bucket histogram in the Prometheus model (per-bucket counts, sum and count), safe to observe from any thread """
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[slot] += 1
+            self._sum += value
+            self._count += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            counts, total, count = list(self._counts), self._sum, self._count
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {count}')
+        lines.append(f"{self.name}_sum {total}")
+        lines.append(f"{self.name}_count {count}")
+        return lines
+
+class Counter:
+    """ Monotonic counter incremented in place, safe to increment from any thread """
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        with self._lock:
+            return self._value
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter", f"{self.name} {float(self.value)}"]
+
+class CallbackMetric:
+    """ Gauge/counter whose value is read from [read] at scrape time (store size, cache stats, ...) """
+    def __init__(self, name: str, help_text: str, read: Callable[[], float], kind: str = "gauge"):
+        self.name = name
+        self.help_text = help_text
+        self.read = read
+        self.kind = kind
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}", f"{self.name} {float(self.read())}"]
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, help_text, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, help_text: str, read: Callable[[], float]) -> CallbackMetric:
+        metric = CallbackMetric(name, help_text, read, "gauge")
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str, read: Callable[[], float]) -> CallbackMetric:
+        metric = CallbackMetric(name, help_text, read, "counter")
+        self._metrics.append(metric)
+        return metric
+
+    def incrementing_counter(self, name: str, help_text: str) -> Counter:
+        metric = Counter(name, help_text)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """ Prometheus text exposition format (version 0.0.4) """
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+# serving path, in request order
+query_embedding_seconds = registry.histogram("chatbot_query_embedding_seconds", "Query embedding time (cache misses, including batcher wait)")
+vector_search_seconds = registry.histogram("chatbot_vector_search_seconds", "VectorStore.retrieve_top_k time")
+format_chunks_seconds = registry.histogram("chatbot_format_chunks_seconds", "format_chunks time (reads hit texts from the store)")
+llm_time_to_first_token_seconds = registry.histogram("chatbot_llm_time_to_first_token_seconds",
+                                                     "Time from sending the prompt to Ollama to its first token", LLM_LATENCY_BUCKETS)
+llm_tokens_per_second = registry.histogram("chatbot_llm_tokens_per_second", "Ollama generation rate (eval_count / eval_duration)",
+                                           TOKEN_RATE_BUCKETS)
+llm_stream_duration_seconds = registry.histogram("chatbot_llm_stream_duration_seconds", "Total duration of a streamed LLM response",
+                                                 LLM_LATENCY_BUCKETS)
+
+# retrieval
+near_duplicate_hits_dropped = registry.incrementing_counter("chatbot_near_duplicate_hits_dropped_total",
+                                                            "Hits skipped as near-identical copies of a higher-ranked article")
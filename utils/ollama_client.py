@@ -1,10 +1,66 @@
 import asyncio
+import time
+import httpx
 import ollama
 from typing import Optional, List, Dict, AsyncGenerator
 from settings import Config, Logger
+from utils.metrics import llm_time_to_first_token_seconds, llm_tokens_per_second
+from utils.context_builder import build_article_context, create_prompt_with_articles, count_tokens
 
 config = Config.get_instance()
 runtime_logger = Logger.get_runtime_logger("chatbot")
+_client: Optional[ollama.AsyncClient] = None
+
+def get_client() -> ollama.AsyncClient:
+    """
+    Process-wide non-blocking Ollama client so every request reuses one pooled set of keep-alive connections
+    """
+    global _client
+    if _client is None:
+        max_connections = config.llm.get("Max_Connections", 20)
+        _client = ollama.AsyncClient(
+            host=config.llm["Endpoint"],
+            timeout=config.llm.get("Timeout", 120),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+    return _client
+
+async def close_ollama_client(client: ollama.AsyncClient) -> None:
+    """
+    Closes an AsyncClient's connection pool. Uses the public close() where the installed ollama has one; older releases
+    only expose the wrapped httpx client, and if neither exists this raises instead of leaking the pool unnoticed
+    """
+    close = getattr(client, "close", None)
+    if close is not None:
+        await close()
+        return
+    http_client = getattr(client, "_client", None)
+    if not isinstance(http_client, httpx.AsyncClient):
+        raise TypeError(f"Don't know how to close {type(client).__name__} from ollama {getattr(ollama, '__version__', '?')}")
+    await http_client.aclose()
+
+async def close_client() -> None:
+    """ Closes the shared client's connection pool (run on app shutdown) """
+    global _client
+    if _client is not None:
+        await close_ollama_client(_client)
+        _client = None
+
+def llm_options() -> Dict:
+    # num_ctx must match the Modelfile's PARAMETER num_ctx, otherwise Ollama reloads the model for the request;
+    # num_predict caps the answer at the Max_Response_Tokens the context builder reserved out of that window
+    return {"temperature": 0.3, "num_ctx": config.llm["Num_Ctx"], "num_predict": config.llm["Max_Response_Tokens"]}
+
+async def warm_model() -> None:
+    """ Loads the model into memory and pins it for config.llm["Keep_Alive"] (run at app startup) """
+    try:
+        # also loads the LLM tokenizer used for the context budget off the event loop
+        await asyncio.to_thread(count_tokens, "")
+        await get_client().chat(model=config.llm["Model"], messages=[], options=llm_options(),
+                                keep_alive=config.llm["Keep_Alive"])
+        runtime_logger.info(f"{config.llm['Model']} loaded and pinned (keep_alive={config.llm['Keep_Alive']})")
+    except Exception as e:
+        runtime_logger.warning(f"Could not warm {config.llm['Model']}: {str(e)}")
 
 async def generate_response_stream(query: str, text_related: List[Dict] = None) -> AsyncGenerator[str, None]:
     """
@@ -18,37 +74,43 @@ async def generate_response_stream(query: str, text_related: List[Dict] = None)
         LLM generated response based on context, sent as tokens
     """
     if text_related:
-        articles = [
-            f"[Article Title:]{a['Title']}\n[Newsletter where article is from:]{a['Newsletter_From']}\n[Article Content:]{a['Content']}"
-            for a in text_related
-        ]
+        # tokenizes every article and candidate sentence (and may load the tokenizer), so keep it off the event loop
+        articles = await asyncio.to_thread(build_article_context, query, text_related)
         prompt = create_prompt_with_articles(query, articles)
     else:
         prompt = f"{query}"
 
     runtime_logger.info(f"Streaming prompt to {config.llm['Model']} ({len(prompt)} chars)")
 
+    stream = None
+    sent_at = time.perf_counter()
+    first_token = True
     try:
-        client = ollama.Client(host=config.llm["Endpoint"])
-
-        for chunk in client.chat(
+        stream = await get_client().chat(
             model=config.llm["Model"],
             messages=[{"role": "user", "content": prompt}],
             stream=True,
-            options={"temperature": 0.3, "timeout": 120}
-        ):
+            options=llm_options(),
+            keep_alive=config.llm["Keep_Alive"]
+        )
+
+        async for chunk in stream:
             if "message" in chunk and "content" in chunk["message"]:
+                if first_token and chunk["message"]["content"]:
+                    llm_time_to_first_token_seconds.observe(time.perf_counter() - sent_at)
+                    first_token = False
                 yield chunk["message"]["content"]
+            if chunk.get("done") and chunk.get("eval_count") and chunk.get("eval_duration"):
+                # Ollama's own generation counters (eval_duration is in ns), excluding prompt processing
+                llm_tokens_per_second.observe(chunk["eval_count"] / (chunk["eval_duration"] / 1e9))
 
+    except asyncio.CancelledError:
+        # browser disconnected -> closing the stream below drops the HTTP response so Ollama stops generating
+        runtime_logger.info("LLM stream cancelled by client disconnect")
+        raise
     except Exception as e:
         runtime_logger.error(f"Error streaming LLM response: {str(e)}")
         yield f"[Connection Error: Cannot connect to Ollama service. Error: {str(e)}]"
-
-def create_prompt_with_articles(query: str, articles: List[str]) -> str:
-    articles_text = "\n\n".join(articles)
-    return f"""The user asks: "{query}"
-
-Here are relevant newsletter articles:
-{articles_text}
-
-Please analyze accordingly."""
+    finally:
+        if stream is not None:
+            await stream.aclose()
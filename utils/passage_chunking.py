@@ -0,0 +1,68 @@
+from typing import List, Tuple
+from settings import Config, ModelResources
+
+config = Config.get_instance()
+resources = ModelResources.get_instance()
+
+# bge/BERT max_length minus [CLS] and [SEP]
+MODEL_MAX_TOKENS = 510
+
+CONTENT_MARKER = "\n\nContent: "
+
+def passage_header(title: str, url: str) -> str:
+    return f"Title: {title}\n\nSource: {url}{CONTENT_MARKER}"
+
+def split_passages(title: str, url: str, content: str) -> Tuple[List[str], bool]:
+    """
+    Splits an article into overlapping windows of config.passage_tokens tokens (config.passage_overlap_tokens shared between
+    neighbours) so no part of it is lost to the model's 512-token truncation. Every passage repeats the title/source header,
+    and the window shrinks so header + passage always fits the model.
+
+    Returns:
+        (passage texts in article order, whether the article was cut at config.max_passages_per_article)
+    """
+    tokenizer = resources.tokenizer
+    header = passage_header(title, url)
+    header_tokens = len(tokenizer(header, add_special_tokens=False)["input_ids"])
+    window = max(32, min(config.passage_tokens, MODEL_MAX_TOKENS - header_tokens))
+    overlap = min(config.passage_overlap_tokens, window // 2)
+
+    # character span of every token, so passages are cut from the original text rather than decoded back from ids
+    offsets = tokenizer(content, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+    if len(offsets) <= window:
+        return [header + content], False
+
+    passages = []
+    stride = window - overlap
+    for start in range(0, len(offsets), stride):
+        end = min(start + window, len(offsets))
+        passages.append(header + content[offsets[start][0]:offsets[end - 1][1]])
+        if end == len(offsets):
+            return passages, False
+        if len(passages) == config.max_passages_per_article:
+            return passages, True
+    return passages, False
+
+def join_passages(passages: List[str]) -> str:
+    """
+    Inverse of split_passages: the article text under a single header. Neighbouring passages are cut from the same text,
+    so the start of each one is found inside the previous passage and only the new part is appended.
+    """
+    if not passages:
+        return ""
+    text = passages[0]
+    for passage in passages[1:]:
+        header_end = passage.find(CONTENT_MARKER)
+        body = passage[header_end + len(CONTENT_MARKER):] if header_end != -1 else passage
+        text = _merge_overlap(text, body)
+    return text
+
+def _merge_overlap(text: str, body: str) -> str:
+    probe = body[:32]
+    start = text.find(probe) if probe else -1
+    while start != -1:
+        if body.startswith(text[start:]):
+            return text + body[len(text) - start:]
+        start = text.find(probe, start + 1)
+    # no overlap (config.passage_overlap_tokens == 0, or a passage missing from the store)
+    return f"{text} {body}"
@@ -0,0 +1,76 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+class QueryCache:
+    """
+    Bounded LRU + TTL cache keyed on normalized query text plus a [scope] string (e.g. the search filters applied).
+    Each entry is tied to the VectorStore generation it was computed against, so swapping in a new index
+    (VectorStore.load()) drops every cached result on the next lookup.
+    """
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 900.0):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._generation: Optional[int] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """
+        Case/whitespace-insensitive key, also ignoring a trailing ?, ! or . ("c++", "c#" and ".net" stay distinct from
+        "c" and "net", so only trivially different phrasings share an entry)
+        """
+        return " ".join(query.lower().split()).rstrip("?!.").rstrip()
+
+    def _sync_generation(self, generation: int) -> None:
+        if generation != self._generation:
+            self._entries.clear()
+            self._generation = generation
+
+    def get(self, query: str, generation: int, scope: str = "") -> Optional[Any]:
+        key = (scope, self.normalize(query))
+        with self._lock:
+            self._sync_generation(generation)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, query: str, generation: int, value: Any, scope: str = "") -> None:
+        key = (scope, self.normalize(query))
+        with self._lock:
+            if self._generation is not None and generation < self._generation:
+                # computed against a store that has since been swapped out
+                return
+            self._sync_generation(generation)
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
@@ -0,0 +1,38 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from settings import SearchHit
+
+class RetrievalHandles:
+    """
+    Short-lived server-side store of retrieval results. /related_articles hands the browser an opaque id instead of the
+    article text, and /chat resolves that id back to the hits, so context never round-trips through (or is injected by) the client.
+    Handles live in this process only: with several uvicorn workers a /chat can land on a worker that never saw the id,
+    and /chat then re-runs retrieval for the message instead.
+    """
+    def __init__(self, max_entries: int = 4096, ttl_seconds: float = 600.0):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, List[SearchHit]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, hits: List[SearchHit]) -> str:
+        retrieval_id = uuid.uuid4().hex
+        with self._lock:
+            self._entries[retrieval_id] = (time.monotonic(), hits)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return retrieval_id
+
+    def get(self, retrieval_id: str) -> Optional[List[SearchHit]]:
+        with self._lock:
+            entry = self._entries.get(retrieval_id)
+            if entry is None:
+                return None
+            created_at, hits = entry
+            if time.monotonic() - created_at > self.ttl_seconds:
+                del self._entries[retrieval_id]
+                return None
+            return hits
@@ -0,0 +1,33 @@
+import threading
+from typing import Optional
+from settings import Logger, VectorStore
+
+runtime_logger = Logger.get_runtime_logger("chatbot")
+
+class StoreReloader:
+    """
+    Background watcher that polls for a newly published VectorStore generation and swaps it in without restarting the app.
+    Loading happens on this thread; request handlers keep serving from the active generation until the reference flips.
+    """
+    def __init__(self, vector_store: VectorStore, interval_seconds: float = 30.0):
+        self.vector_store = vector_store
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="store-reloader", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.vector_store.reload_if_changed()
+            except Exception as e:
+                runtime_logger.error(f"VectorStore hot reload failed, keeping generation {self.vector_store.state.generation_id}: {str(e)}")